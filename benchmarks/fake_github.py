@@ -0,0 +1,285 @@
+import base64
+import gzip
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+LANGUAGES = ["Python", "JavaScript", "TypeScript", "Java", "C", "C++", "Go", "Rust", "Shell", "HTML", "CSS"]
+
+
+class SyntheticAccount:
+    def __init__(self, owner: str, repo_count: int, fork_ratio: float = 0.1, seed: int = 7) -> None:
+        rng = random.Random(seed)
+        self.owner = owner
+        self.repos: list[dict] = []
+        base_time = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        for index in range(repo_count):
+            languages = {
+                language: rng.randint(100, 200_000)
+                for language in rng.sample(LANGUAGES, rng.randint(0, 4))
+            }
+            primary = max(languages, key=languages.get) if languages else None
+            self.repos.append(
+                {
+                    "name": f"repo-{index:05d}",
+                    "full_name": f"{owner}/repo-{index:05d}",
+                    "fork": rng.random() < fork_ratio,
+                    "language": primary,
+                    "languages": languages,
+                    "pushed_at": (base_time + timedelta(hours=index)).isoformat().replace("+00:00", "Z"),
+                    "owner_contributed": rng.random() < 0.5,
+                }
+            )
+        self.by_name = {repo["full_name"]: repo for repo in self.repos}
+        # Deterministic pseudo-random contribution count per day.
+        self.day_seed = seed
+
+    def contributions_on(self, day: date) -> int:
+        digest = hashlib.sha256(f"{self.day_seed}:{day.isoformat()}".encode("utf-8")).digest()
+        return digest[0] % 6 if digest[1] % 3 else 0
+
+    def rest_repo(self, repo: dict) -> dict:
+        # Pad with the kind of bulk the real REST repo object carries.
+        payload = {
+            "name": repo["name"],
+            "full_name": repo["full_name"],
+            "fork": repo["fork"],
+            "language": repo["language"],
+            "pushed_at": repo["pushed_at"],
+            "owner": {"login": self.owner, "type": "User", "site_admin": False},
+            "permissions": {"admin": True, "maintain": True, "push": True, "triage": True, "pull": True},
+            "description": "Synthetic repository for benchmarking",
+        }
+        for field in ("archive", "assignees", "blobs", "branches", "collaborators", "comments", "commits", "compare"):
+            payload[f"{field}_url"] = f"https://api.github.com/repos/{repo['full_name']}/{field}"
+        return payload
+
+
+class FakeGitHub:
+    def __init__(self, account: SyntheticAccount, latency: float = 0.0) -> None:
+        self.account = account
+        self.latency = latency
+        self.requests: Counter = Counter()
+        self.rate_limit_remaining = 4999
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self.server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_port}"
+
+    def start(self) -> "FakeGitHub":
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def count(self, kind: str) -> None:
+        with self._lock:
+            self.requests[kind] += 1
+
+    def reset_counts(self) -> Counter:
+        with self._lock:
+            counts = self.requests
+            self.requests = Counter()
+        return counts
+
+    def _handler_class(self) -> type[BaseHTTPRequestHandler]:
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def log_message(self, format: str, *args: object) -> None:
+                return
+
+            def send_json(self, payload: object, status: int = 200, resource: str = "core") -> None:
+                raw = json.dumps(payload).encode("utf-8")
+                etag = '"' + hashlib.sha1(raw).hexdigest() + '"'
+                if status == 200 and self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                encoded = "gzip" in (self.headers.get("Accept-Encoding") or "")
+                if encoded:
+                    raw = gzip.compress(raw, compresslevel=1)
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                if encoded:
+                    self.send_header("Content-Encoding", "gzip")
+                self.send_header("ETag", etag)
+                self.send_header("X-RateLimit-Limit", "5000")
+                self.send_header("X-RateLimit-Remaining", "4999")
+                self.send_header("X-RateLimit-Reset", str(int(time.time()) + 3600))
+                self.send_header("X-RateLimit-Resource", resource)
+                self.send_header("Content-Length", str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+
+            def do_GET(self) -> None:
+                parts = urlsplit(self.path)
+                if parts.path == "/_stats":
+                    # Out-of-band endpoint for the harness; not counted as an API request.
+                    return self.send_json(dict(fake.reset_counts()))
+                if parts.path == "/rate_limit":
+                    # Like GitHub, checking the budget is not charged against it.
+                    reset = int(time.time()) + 3600
+                    return self.send_json(
+                        {
+                            "resources": {
+                                resource: {"limit": 5000, "remaining": fake.rate_limit_remaining, "reset": reset}
+                                for resource in ("core", "graphql")
+                            }
+                        }
+                    )
+                if fake.latency:
+                    time.sleep(fake.latency)
+                query = parse_qs(parts.query)
+                page = int(query.get("page", ["1"])[0])
+                per_page = int(query.get("per_page", ["30"])[0])
+                path = parts.path
+                account = fake.account
+
+                if path == "/user":
+                    fake.count("user")
+                    return self.send_json({"login": account.owner, "type": "User"})
+                if re.fullmatch(r"/users/[^/]+", path):
+                    fake.count("user")
+                    return self.send_json({"login": account.owner, "type": "User"})
+                if path in ("/user/repos", f"/users/{account.owner}/repos", f"/orgs/{account.owner}/repos"):
+                    fake.count("repos_list")
+                    chunk = account.repos[(page - 1) * per_page : page * per_page]
+                    return self.send_json([account.rest_repo(repo) for repo in chunk])
+
+                match = re.fullmatch(r"/repos/([^/]+/[^/]+)/(languages|commits)", path)
+                repo = account.by_name.get(match.group(1)) if match else None
+                if repo is None:
+                    fake.count("not_found")
+                    return self.send_json({"message": "Not Found"}, status=404)
+                kind = match.group(2)
+                fake.count(kind)
+                if kind == "languages":
+                    return self.send_json(repo["languages"])
+                return self.send_json([{"sha": "0" * 40}] if repo["owner_contributed"] else [])
+
+            def do_POST(self) -> None:
+                if fake.latency:
+                    time.sleep(fake.latency)
+                length = int(self.headers.get("Content-Length") or 0)
+                request = json.loads(self.rfile.read(length) or b"{}")
+                query = request.get("query", "")
+                variables = request.get("variables") or {}
+                if "repositoryOwner" in query:
+                    fake.count("graphql_repos")
+                    return self.send_json({"data": self.repositories(variables)}, resource="graphql")
+                if "commitContributionsByRepository" in query:
+                    fake.count("graphql_commit_contributions")
+                    return self.send_json({"data": self.commit_contributions(variables)}, resource="graphql")
+                if "contributionsCollection" in query:
+                    fake.count("graphql_contributions")
+                    return self.send_json({"data": self.contributions(variables)}, resource="graphql")
+                fake.count("graphql_other")
+                return self.send_json({"errors": [{"message": "unsupported query"}]}, resource="graphql")
+
+            def repositories(self, variables: dict) -> dict:
+                account = fake.account
+                cursor = variables.get("cursor")
+                offset = int(base64.b64decode(cursor).decode("ascii")) if cursor else 0
+                first = int(variables.get("languagesFirst") or 10)
+                chunk = account.repos[offset : offset + 100]
+                nodes = []
+                for repo in chunk:
+                    edges = sorted(repo["languages"].items(), key=lambda item: -item[1])
+                    nodes.append(
+                        {
+                            "nameWithOwner": repo["full_name"],
+                            "isFork": repo["fork"],
+                            "pushedAt": repo["pushed_at"],
+                            "owner": {"login": account.owner},
+                            "parent": {"nameWithOwner": f"upstream/{repo['name']}"} if repo["fork"] else None,
+                            "primaryLanguage": {"name": repo["language"]} if repo["language"] else None,
+                            "languages": {
+                                "totalCount": len(edges),
+                                "edges": [{"size": size, "node": {"name": name}} for name, size in edges[:first]],
+                            },
+                        }
+                    )
+                end = offset + len(chunk)
+                return {
+                    "repositoryOwner": {
+                        "login": account.owner,
+                        "repositories": {
+                            "pageInfo": {
+                                "hasNextPage": end < len(account.repos),
+                                "endCursor": base64.b64encode(str(end).encode("ascii")).decode("ascii"),
+                            },
+                            "nodes": nodes,
+                        },
+                    }
+                }
+
+            def contributions(self, variables: dict) -> dict:
+                user: dict = {}
+                for key, from_iso in variables.items():
+                    if not key.startswith("from"):
+                        continue
+                    suffix = key[len("from") :]
+                    start = datetime.fromisoformat(from_iso.replace("Z", "+00:00")).date()
+                    end = datetime.fromisoformat(str(variables[f"to{suffix}"]).replace("Z", "+00:00")).date()
+                    days = [
+                        {"date": (start + timedelta(days=i)).isoformat(), "contributionCount": fake.account.contributions_on(start + timedelta(days=i))}
+                        for i in range((end - start).days + 1)
+                    ]
+                    weeks = [{"contributionDays": days[i : i + 7]} for i in range(0, len(days), 7)]
+                    user[f"c{suffix}"] = {"contributionCalendar": {"weeks": weeks}}
+                return {"user": user}
+
+            def commit_contributions(self, variables: dict) -> dict:
+                account = fake.account
+                first = int(variables.get("languagesFirst") or 10)
+                user: dict = {}
+                for key, from_iso in variables.items():
+                    if not key.startswith("from"):
+                        continue
+                    suffix = key[len("from") :]
+                    start = datetime.fromisoformat(from_iso.replace("Z", "+00:00")).date()
+                    end = datetime.fromisoformat(str(variables[f"to{suffix}"]).replace("Z", "+00:00")).date()
+                    total = sum(account.contributions_on(start + timedelta(days=i)) for i in range((end - start).days + 1))
+                    # Spread the window's contributions over the most recently pushed repos, capped like the real API.
+                    repos = sorted(account.repos, key=lambda repo: repo["pushed_at"], reverse=True)[: min(100, max(1, total // 5))]
+                    entries = []
+                    for index, repo in enumerate(repos):
+                        share = total // len(repos) + (1 if index < total % len(repos) else 0)
+                        if not share:
+                            continue
+                        edges = sorted(repo["languages"].items(), key=lambda item: -item[1])[:first]
+                        entries.append(
+                            {
+                                "contributions": {"totalCount": share},
+                                "repository": {
+                                    "nameWithOwner": repo["full_name"],
+                                    "primaryLanguage": {"name": repo["language"]} if repo["language"] else None,
+                                    "languages": {"edges": [{"size": size, "node": {"name": name}} for name, size in edges]},
+                                },
+                            }
+                        )
+                    user[f"w{suffix}"] = {"commitContributionsByRepository": entries}
+                return {"user": user}
+
+        return Handler
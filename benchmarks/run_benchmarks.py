@@ -0,0 +1,180 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+from urllib.request import urlopen
+
+from fake_github import FakeGitHub, SyntheticAccount
+
+
+BENCH_DIR = Path(__file__).resolve().parent
+SCRIPTS_DIR = BENCH_DIR.parent / "scripts"
+OWNER = "bench-user"
+DEFAULT_SIZES = "10,100,1000,5000"
+
+
+def measure(stage: str, api_url: str, fn: Callable[[], object]) -> tuple[object, dict]:
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    started = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    with urlopen(f"{api_url}/_stats") as response:
+        requests = json.loads(response.read().decode("utf-8"))
+    return result, {
+        "stage": stage,
+        "wall_s": round(elapsed, 4),
+        "requests": sum(requests.values()),
+        "requests_by_kind": requests,
+        "peak_mib": round(peak / (1024 * 1024), 3),
+    }
+
+
+def run_worker(api_url: str, workdir: Path) -> list[dict]:
+    # Runs in a fresh interpreter: fetch_language_counts reads its configuration at import time.
+    sys.path.insert(0, str(SCRIPTS_DIR))
+    import fetch_language_counts as fetch
+    from repo_snapshots import RepoSnapshotStore
+
+    results: list[dict] = []
+    repos, row = measure("fetch_repos", api_url, lambda: fetch.fetch_repos(OWNER))
+    results.append(row)
+
+    forks = [repo for repo in repos if repo.fork]
+    _, row = measure(
+        "fork_contribution",
+        api_url,
+        lambda: [fetch._fork_contribution(repo.full_name, OWNER, repo.pushed_at) for repo in forks],
+    )
+    results.append(row)
+
+    _, row = measure("count_languages", api_url, lambda: fetch.count_languages(repos, OWNER))
+    results.append(row)
+
+    # Second pass over unchanged repos is served entirely from the per-repo snapshot store.
+    _, row = measure("count_languages_snapshots", api_url, lambda: fetch.count_languages(repos, OWNER))
+    results.append(row)
+
+    graphql_repos, row = measure("fetch_repos_graphql", api_url, lambda: fetch.fetch_repos_graphql(OWNER))
+    results.append(row)
+
+    # Start the GraphQL pass from an empty snapshot store so it measures the prefetched-languages path.
+    fetch.REPO_SNAPSHOTS = RepoSnapshotStore(workdir / "graphql-snapshots.json")
+    _, row = measure("count_languages_graphql", api_url, lambda: fetch.count_languages(graphql_repos, OWNER))
+    results.append(row)
+
+    _, row = measure(
+        "count_contributions_by_day",
+        api_url,
+        lambda: fetch.count_contributions_by_day(OWNER, days=365, output_dir=workdir),
+    )
+    results.append(row)
+
+    _, row = measure("count_language_activity", api_url, lambda: fetch.count_language_activity(OWNER))
+    results.append(row)
+    return results
+
+
+def run_size(size: int, args: argparse.Namespace) -> list[dict]:
+    fake = FakeGitHub(SyntheticAccount(OWNER, size), latency=args.latency_ms / 1000).start()
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            env = {
+                **os.environ,
+                "GITHUB_API_URL": fake.url,
+                "GH_TOKEN": "benchmark-token",
+                "GITHUB_REPOSITORY_OWNER": OWNER,
+                "FETCH_WORKERS": str(args.workers),
+                "GITHUB_MAX_RPS": str(args.max_rps),
+                "HTTP_CACHE": "1" if args.cache else "0",
+                "HTTP_CACHE_DIR": str(Path(workdir) / "http"),
+                "FORK_VERDICT_CACHE": str(Path(workdir) / "fork-verdicts.json"),
+                "REPO_SNAPSHOT_STORE": str(Path(workdir) / "repo-snapshots.json"),
+                "SCAN_CHECKPOINT_DIR": str(Path(workdir) / "scan-checkpoints"),
+            }
+            completed = subprocess.run(
+                [sys.executable, __file__, "--worker", fake.url, workdir],
+                env=env,
+                capture_output=True,
+                text=True,
+                check=False,
+            )
+    finally:
+        fake.stop()
+    if completed.returncode != 0:
+        raise SystemExit(f"Benchmark worker failed for {size} repos:\n{completed.stderr}")
+    rows = json.loads(completed.stdout.strip().splitlines()[-1])
+    for row in rows:
+        row["repos"] = size
+    return rows
+
+
+def print_table(rows: list[dict]) -> None:
+    print(f"{'repos':>6}  {'stage':<28}  {'wall':>9}  {'requests':>8}  {'peak MiB':>9}")
+    for row in rows:
+        print(
+            f"{row['repos']:>6}  {row['stage']:<28}  {row['wall_s']:>8.3f}s  {row['requests']:>8}  {row['peak_mib']:>9.3f}"
+        )
+
+
+def compare(rows: list[dict], baseline_path: Path, tolerance: float) -> list[str]:
+    baseline = {(row["repos"], row["stage"]): row for row in json.loads(baseline_path.read_text(encoding="utf-8"))}
+    regressions: list[str] = []
+    for row in rows:
+        before = baseline.get((row["repos"], row["stage"]))
+        if before is None:
+            continue
+        label = f"{row['stage']} @ {row['repos']} repos"
+        # Request counts are deterministic, so any increase is a regression.
+        if row["requests"] > before["requests"]:
+            regressions.append(f"{label}: requests {before['requests']} -> {row['requests']}")
+        if row["wall_s"] > before["wall_s"] * (1 + tolerance):
+            regressions.append(f"{label}: wall {before['wall_s']:.3f}s -> {row['wall_s']:.3f}s")
+        if row["peak_mib"] > before["peak_mib"] * (1 + tolerance):
+            regressions.append(f"{label}: peak {before['peak_mib']:.3f} MiB -> {row['peak_mib']:.3f} MiB")
+    return regressions
+
+
+def main() -> None:
+    if len(sys.argv) == 4 and sys.argv[1] == "--worker":
+        print(json.dumps(run_worker(sys.argv[2], Path(sys.argv[3]))))
+        return
+
+    parser = argparse.ArgumentParser(description="Benchmark the GitHub stats pipeline against a local fake API.")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help=f"comma-separated repo counts (default {DEFAULT_SIZES})")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="simulated per-request latency")
+    parser.add_argument("--workers", type=int, default=8, help="FETCH_WORKERS for the pipeline")
+    parser.add_argument("--max-rps", type=float, default=0, help="GITHUB_MAX_RPS (0 disables pacing)")
+    parser.add_argument("--cache", action="store_true", help="enable the on-disk HTTP cache")
+    parser.add_argument("--json", type=Path, help="write results to this file")
+    parser.add_argument("--baseline", type=Path, help="fail if results regress against this results file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed wall/memory growth vs baseline")
+    args = parser.parse_args()
+
+    rows: list[dict] = []
+    for size in (int(value) for value in args.sizes.split(",") if value.strip()):
+        rows.extend(run_size(size, args))
+    print_table(rows)
+
+    if args.json:
+        args.json.write_text(json.dumps(rows, indent=2) + "\n", encoding="utf-8")
+    if args.baseline:
+        regressions = compare(rows, args.baseline, args.tolerance)
+        if regressions:
+            print("Regressions against baseline:")
+            for regression in regressions:
+                print(f"  {regression}")
+            raise SystemExit(1)
+        print("No regressions against baseline.")
+
+
+if __name__ == "__main__":
+    main()
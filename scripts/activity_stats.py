@@ -0,0 +1,155 @@
+from datetime import date, timedelta
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+ROLLING_WINDOWS = (7, 30)
+WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+INTENSITY_PERCENTILES = (25, 50, 75)
+
+
+def percentile(values: list[int], q: float) -> float:
+    # Linear interpolation between closest ranks, matching numpy.percentile's default.
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def intensity_level(count: int, thresholds: list[float]) -> int:
+    if count <= 0:
+        return 0
+    return 1 + sum(1 for threshold in thresholds if count > threshold)
+
+
+def _window_stats(
+    days: int,
+    total: int,
+    coded: int,
+    current_streak: int,
+    longest_streak: int,
+    rolling: dict[str, dict[str, int]],
+    weekdays: list[int],
+    thresholds: list[float],
+) -> dict:
+    return {
+        "window_days": days,
+        "coded_days": coded,
+        "coded_days_percent": round((coded / days) * 100, 1) if days else 0.0,
+        "total_contributions": total,
+        "current_streak": current_streak,
+        "longest_streak": longest_streak,
+        "rolling_sums": rolling,
+        "weekday_contributions": dict(zip(WEEKDAYS, weekdays)),
+        "intensity_thresholds": [round(value, 2) for value in thresholds],
+    }
+
+
+def _current_streak(run_lengths, last: int, window: int) -> int:
+    # A zero today doesn't break the streak yet: the day isn't over, so count through yesterday.
+    streak = int(run_lengths[last])
+    if streak == 0 and last > 0 and window > 1:
+        streak = int(run_lengths[last - 1])
+        return min(streak, window - 1)
+    return min(streak, window)
+
+
+def _stats_numpy(counts: list[int], end_day: date, windows: tuple[int, ...]) -> dict[int, dict]:
+    series = np.asarray(counts, dtype=np.int64)
+    n = len(series)
+    index = np.arange(n)
+    active = series > 0
+    # Length of the active run ending at each day: distance to the most recent inactive day.
+    last_inactive = np.maximum.accumulate(np.where(active, -1, index))
+    run_lengths = np.where(active, index - last_inactive, 0)
+    cumulative = np.concatenate(([0], np.cumsum(series)))
+    first_weekday = (end_day - timedelta(days=n - 1)).weekday()
+    weekday_index = (index + first_weekday) % 7
+
+    stats: dict[int, dict] = {}
+    for days in windows:
+        window = min(days, n)
+        start = n - window
+        if window == 0:
+            stats[days] = _window_stats(days, 0, 0, 0, 0, {}, [0] * 7, [])
+            continue
+        span = series[start:]
+        longest = int(np.minimum(run_lengths[start:], np.arange(1, window + 1)).max())
+        rolling: dict[str, dict[str, int]] = {}
+        for size in ROLLING_WINDOWS:
+            k = min(size, window)
+            sums = cumulative[start + k :] - cumulative[start : n - k + 1]
+            rolling[f"{size}d"] = {"latest": int(sums[-1]), "max": int(sums.max())}
+        weekdays = np.bincount(weekday_index[start:], weights=span, minlength=7)
+        nonzero = span[span > 0]
+        thresholds = (
+            [float(value) for value in np.percentile(nonzero, INTENSITY_PERCENTILES)] if nonzero.size else []
+        )
+        stats[days] = _window_stats(
+            days,
+            int(span.sum()),
+            int(active[start:].sum()),
+            _current_streak(run_lengths, n - 1, window),
+            longest,
+            rolling,
+            [int(value) for value in weekdays],
+            thresholds,
+        )
+    return stats
+
+
+def _stats_python(counts: list[int], end_day: date, windows: tuple[int, ...]) -> dict[int, dict]:
+    n = len(counts)
+    run_lengths = [0] * n
+    cumulative = [0] * (n + 1)
+    run = 0
+    for i, count in enumerate(counts):
+        run = run + 1 if count > 0 else 0
+        run_lengths[i] = run
+        cumulative[i + 1] = cumulative[i] + count
+    first_weekday = (end_day - timedelta(days=n - 1)).weekday()
+
+    stats: dict[int, dict] = {}
+    for days in windows:
+        window = min(days, n)
+        start = n - window
+        if window == 0:
+            stats[days] = _window_stats(days, 0, 0, 0, 0, {}, [0] * 7, [])
+            continue
+        span = counts[start:]
+        longest = max(min(run_lengths[start + i], i + 1) for i in range(window))
+        rolling: dict[str, dict[str, int]] = {}
+        for size in ROLLING_WINDOWS:
+            k = min(size, window)
+            sums = [cumulative[i + k] - cumulative[i] for i in range(start, n - k + 1)]
+            rolling[f"{size}d"] = {"latest": sums[-1], "max": max(sums)}
+        weekdays = [0] * 7
+        for i in range(start, n):
+            weekdays[(i + first_weekday) % 7] += counts[i]
+        nonzero = [count for count in span if count > 0]
+        thresholds = [percentile(nonzero, q) for q in INTENSITY_PERCENTILES] if nonzero else []
+        stats[days] = _window_stats(
+            days,
+            cumulative[n] - cumulative[start],
+            sum(1 for count in span if count > 0),
+            _current_streak(run_lengths, n - 1, window),
+            longest,
+            rolling,
+            weekdays,
+            thresholds,
+        )
+    return stats
+
+
+def compute_activity_stats(counts: list[int], end_day: date, windows: tuple[int, ...]) -> dict[int, dict]:
+    # counts is the day-ordered series ending on end_day; every window is a suffix of it,
+    # so run lengths, prefix sums and weekday indices are built once and shared.
+    if np is not None:
+        return _stats_numpy(counts, end_day, windows)
+    return _stats_python(counts, end_day, windows)
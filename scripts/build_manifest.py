@@ -0,0 +1,54 @@
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+
+FORCE_REBUILD = os.environ.get("FORCE_REBUILD", "0") == "1"
+
+
+class BuildManifest:
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.entries: dict[str, str] = {}
+        if path.exists():
+            try:
+                loaded = json.loads(path.read_text(encoding="utf-8"))
+            except json.JSONDecodeError:
+                loaded = {}
+            if isinstance(loaded, dict):
+                self.entries = {str(key): str(value) for key, value in loaded.items()}
+
+    @staticmethod
+    def digest(*parts: object, sources: tuple[Path, ...] = ()) -> str:
+        hasher = hashlib.sha256()
+        hasher.update(json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8"))
+        # Hashing the producing script means a code change also invalidates its outputs.
+        for source in sources:
+            hasher.update(source.read_bytes())
+        return hasher.hexdigest()
+
+    def is_fresh(self, key: str, digest: str, outputs: tuple[Path, ...]) -> bool:
+        if FORCE_REBUILD:
+            return False
+        with self._lock:
+            if self.entries.get(key) != digest:
+                return False
+        return all(path.exists() for path in outputs)
+
+    def record(self, key: str, digest: str) -> None:
+        with self._lock:
+            if self.entries.get(key) != digest:
+                self.entries[key] = digest
+                self._dirty = True
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_text(json.dumps(dict(sorted(self.entries.items())), indent=2) + "\n", encoding="utf-8")
+            self._dirty = False
@@ -0,0 +1,140 @@
+import mmap
+import struct
+import sys
+from array import array
+from datetime import date, timedelta
+from pathlib import Path
+
+
+# Layout: fixed 64-byte header followed by one little-endian uint32 count per day,
+# indexed by (day.toordinal() - base_ordinal).
+MAGIC = b"CDAY"
+VERSION = 1
+HEADER = struct.Struct("<4sHHiI48s")
+
+
+class ContributionStore:
+    def __init__(
+        self,
+        owner: str,
+        base_ordinal: int = 0,
+        counts: array | memoryview | None = None,
+        reconciled_ordinal: int = 0,
+    ) -> None:
+        self.owner = owner
+        self.base_ordinal = base_ordinal
+        self.counts: array | memoryview = counts if counts is not None else array("I")
+        self.reconciled_ordinal = reconciled_ordinal
+        self._mapping: mmap.mmap | None = None
+
+    @classmethod
+    def open(cls, path: Path) -> "ContributionStore | None":
+        if not path.exists() or path.stat().st_size < HEADER.size:
+            return None
+        with path.open("rb") as f:
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, base_ordinal, reconciled_ordinal, owner_raw = HEADER.unpack_from(mapping, 0)
+        if magic != MAGIC or version != VERSION:
+            mapping.close()
+            return None
+        body_len = (len(mapping) - HEADER.size) // 4 * 4
+        if sys.byteorder == "little":
+            # Zero-copy view straight over the mapped file.
+            counts: array | memoryview = memoryview(mapping)[HEADER.size : HEADER.size + body_len].cast("I")
+        else:
+            counts = array("I", mapping[HEADER.size : HEADER.size + body_len])
+            counts.byteswap()
+            mapping.close()
+            mapping = None
+        store = cls(owner_raw.rstrip(b"\0").decode("utf-8", errors="ignore"), base_ordinal, counts, reconciled_ordinal)
+        store._mapping = mapping
+        return store
+
+    def close(self) -> None:
+        if self._mapping is not None:
+            self.counts = array("I", self.counts)
+            try:
+                self._mapping.close()
+            except BufferError:
+                # A caller still holds a slice of the mapping; it is released once that view is dropped.
+                pass
+            self._mapping = None
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    @property
+    def first_day(self) -> date | None:
+        return date.fromordinal(self.base_ordinal) if len(self.counts) else None
+
+    @property
+    def last_day(self) -> date | None:
+        return date.fromordinal(self.base_ordinal + len(self.counts) - 1) if len(self.counts) else None
+
+    @property
+    def last_reconciled(self) -> date | None:
+        return date.fromordinal(self.reconciled_ordinal) if self.reconciled_ordinal else None
+
+    @last_reconciled.setter
+    def last_reconciled(self, day: date | None) -> None:
+        self.reconciled_ordinal = day.toordinal() if day else 0
+
+    def get(self, day: date) -> int:
+        index = day.toordinal() - self.base_ordinal
+        if 0 <= index < len(self.counts):
+            return self.counts[index]
+        return 0
+
+    def slice(self, start_day: date, end_day: date) -> memoryview | array:
+        start = start_day.toordinal() - self.base_ordinal
+        stop = end_day.toordinal() - self.base_ordinal + 1
+        if 0 <= start and stop <= len(self.counts):
+            return memoryview(self.counts)[start:stop]
+        # Range reaches outside the stored days: pad the missing days with zeros.
+        padded = array("I", bytes(4 * max(0, stop - start)))
+        lo, hi = max(0, start), min(len(self.counts), stop)
+        if lo < hi:
+            padded[lo - start : hi - start] = array("I", self.counts[lo:hi])
+        return padded
+
+    def window(self, days: int, end_day: date) -> list[tuple[str, int]]:
+        start_day = end_day - timedelta(days=days - 1)
+        return [
+            ((start_day + timedelta(days=i)).isoformat(), count)
+            for i, count in enumerate(self.slice(start_day, end_day))
+        ]
+
+    def update(self, daily_counts: dict[str, int]) -> None:
+        if not daily_counts:
+            return
+        self.close()
+        ordinals = {date.fromisoformat(day).toordinal(): max(0, int(count)) for day, count in daily_counts.items()}
+        counts = array("I", self.counts)
+        if not counts:
+            self.base_ordinal = min(ordinals)
+        low = min(min(ordinals), self.base_ordinal)
+        high = max(max(ordinals), self.base_ordinal + len(counts) - 1)
+        if low < self.base_ordinal:
+            counts = array("I", bytes(4 * (self.base_ordinal - low))) + counts
+            self.base_ordinal = low
+        if high >= self.base_ordinal + len(counts):
+            counts.extend(array("I", bytes(4 * (high - self.base_ordinal - len(counts) + 1))))
+        for ordinal, count in ordinals.items():
+            counts[ordinal - self.base_ordinal] = count
+        self.counts = counts
+
+    def to_dict(self) -> dict[str, int]:
+        return {date.fromordinal(self.base_ordinal + i).isoformat(): count for i, count in enumerate(self.counts)}
+
+    def save(self, path: Path) -> None:
+        body = array("I", self.counts)
+        if sys.byteorder != "little":
+            body.byteswap()
+        header = HEADER.pack(
+            MAGIC, VERSION, 0, self.base_ordinal, self.reconciled_ordinal, self.owner.encode("utf-8")[:48]
+        )
+        self.close()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        tmp_path.write_bytes(header + body.tobytes())
+        tmp_path.replace(path)
@@ -1,13 +1,32 @@
 import csv
+import hashlib
 import json
 import os
-from collections import Counter
-from datetime import datetime, timedelta, timezone
+import queue
+import sys
+import threading
+import time
+from collections import Counter, deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from datetime import date, datetime, timedelta, timezone
+from http.client import HTTPException
 from pathlib import Path
-from urllib.error import HTTPError, URLError
-from urllib.request import Request, urlopen
 from zoneinfo import ZoneInfo
 
+from activity_stats import compute_activity_stats
+from build_manifest import BuildManifest
+from contribution_store import ContributionStore
+from github_client import GitHubAPIError, GitHubClient, GitHubResponse
+from http_cache import ResponseCache
+from language_activity import tally_activity
+from rate_limit import RateLimitError, RateLimitScheduler
+from repo_record import RepoRecord
+from repo_snapshots import COUNTING_MODES, RepoSnapshotStore, tally
+from scan_checkpoint import ScanCheckpoint
+from telemetry import RequestTelemetry
+
 
 def load_dotenv(path: Path) -> None:
     if not path.exists():
@@ -29,13 +48,106 @@ load_dotenv(REPO_ROOT / ".env")
 
 OWNER = os.environ.get("GITHUB_REPOSITORY_OWNER", "Zerius7733")
 TOKEN = os.environ.get("GH_TOKEN", "")
+API_URL = os.environ.get("GITHUB_API_URL", "https://api.github.com").rstrip("/")
 OUTPUT_DIR = REPO_ROOT / "img"
 OUTPUT_CSV = OUTPUT_DIR / "language-project-counts.csv"
 OUTPUT_JSON = OUTPUT_DIR / "language-project-counts.json"
+ACTIVITY_CSV = OUTPUT_DIR / "language-activity-counts.csv"
+ACTIVITY_JSON = OUTPUT_DIR / "language-activity-counts.json"
 SGT = ZoneInfo("Asia/Singapore")
-_FORK_RATE_LIMIT_WARNED = False
-_LANG_RATE_LIMIT_WARNED = False
+SCAN_MODE = os.environ.get("SCAN_MODE", "auto").strip().lower()
+GRAPHQL_LANGUAGES_FIRST = max(1, min(100, int(os.environ.get("GRAPHQL_LANGUAGES_FIRST", "20"))))
+BUILD_MANIFEST_NAME = "build-manifest.json"
+CONTRIBUTION_STORE_NAME = "coding-days.bin"
+_BUILD_MANIFESTS: dict[Path, BuildManifest] = {}
+_MANIFEST_LOCK = threading.Lock()
+_OWNER_KINDS: dict[str, str] = {}
+_OWNER_KIND_LOCKS: dict[str, threading.Lock] = {}
+_OWNER_KIND_LOCK = threading.Lock()
+FORK_VERDICT_CACHE = Path(os.environ.get("FORK_VERDICT_CACHE", REPO_ROOT / ".cache" / "fork-verdicts.json"))
+_FORK_VERDICTS: dict[str, dict] | None = None
+_FORK_VERDICTS_DIRTY = False
+_FORK_VERDICT_LOCK = threading.Lock()
+REPO_SNAPSHOTS = RepoSnapshotStore(
+    Path(os.environ.get("REPO_SNAPSHOT_STORE", REPO_ROOT / ".cache" / "repo-snapshots.json"))
+)
+SCAN_CHECKPOINTS = ScanCheckpoint(
+    Path(os.environ.get("SCAN_CHECKPOINT_DIR", REPO_ROOT / ".cache" / "scan-checkpoints")),
+    max_age_seconds=float(os.environ.get("SCAN_CHECKPOINT_MAX_HOURS", "24")) * 3600,
+)
+COUNTING_MODE = os.environ.get("COUNTING_MODE", "repo_presence").strip().lower()
+if COUNTING_MODE not in COUNTING_MODES:
+    raise RuntimeError(f"COUNTING_MODE must be one of {', '.join(COUNTING_MODES)}, got {COUNTING_MODE!r}")
+CONTRIBUTION_REFRESH_DAYS = max(1, int(os.environ.get("CONTRIBUTION_REFRESH_DAYS", "3")))
+CONTRIBUTION_RECONCILE_DAYS = max(1, int(os.environ.get("CONTRIBUTION_RECONCILE_DAYS", "7")))
+CODING_WINDOWS = tuple(
+    sorted({int(value) for value in os.environ.get("CODING_WINDOWS", "90,180,365").split(",") if value.strip()})
+)
+FETCH_WORKERS = max(1, int(os.environ.get("FETCH_WORKERS", "8")))
+# Shared by every count_languages call, so a multi-owner batch still makes at most FETCH_WORKERS per-repo calls at once.
+_FETCH_SLOTS = threading.BoundedSemaphore(FETCH_WORKERS)
+REPO_PREFETCH = max(1, int(os.environ.get("REPO_PREFETCH", "300")))
+# One keep-alive connection pool shared by REST and GraphQL calls across all worker threads.
+CLIENT = GitHubClient(timeout=20, max_connections=FETCH_WORKERS + 2)
+TELEMETRY = RequestTelemetry()
+RUN_REPORT_NAME = "run-report.json"
+SCHEDULER = RateLimitScheduler(
+    max_rps=float(os.environ.get("GITHUB_MAX_RPS", "25")),
+    burst=int(os.environ.get("GITHUB_BURST", "50")),
+    max_retries=int(os.environ.get("GITHUB_MAX_RETRIES", "4")),
+    max_wait=float(os.environ.get("GITHUB_MAX_RATE_LIMIT_WAIT", "900")),
+)
+HTTP_CACHE_DIR = Path(os.environ.get("HTTP_CACHE_DIR", REPO_ROOT / ".cache" / "http"))
+HTTP_CACHE_MAX_BYTES = int(float(os.environ.get("HTTP_CACHE_MAX_MB", "64")) * 1024 * 1024)
+# Responses differ per credential (private repos), so key cache entries by a token fingerprint.
+HTTP_CACHE = (
+    ResponseCache(HTTP_CACHE_DIR, HTTP_CACHE_MAX_BYTES, namespace=hashlib.sha256(TOKEN.encode("utf-8")).hexdigest()[:16])
+    if os.environ.get("HTTP_CACHE", "1") != "0"
+    else None
+)
 _COMMIT_RATE_LIMIT_WARNED = False
+_ACTIVITY_RATE_LIMIT_WARNED = False
+
+
+def _send(method: str, url: str, headers: dict[str, str], body: bytes | None, resource: str) -> GitHubResponse:
+    attempt = 0
+    while True:
+        SCHEDULER.acquire(resource)
+        started = time.perf_counter()
+        try:
+            response = CLIENT.request(method, url, headers, body)
+        except (OSError, HTTPException):
+            TELEMETRY.record(url, 0, time.perf_counter() - started, 0, False, None, retry=attempt > 0)
+            delay = SCHEDULER.retry_delay(attempt, 503, {}, b"")
+            if delay is None:
+                raise
+        else:
+            # Conditional requests are only sent for cached URLs, so a 304 is a cache hit.
+            TELEMETRY.record(
+                url,
+                response.status,
+                time.perf_counter() - started,
+                response.wire_bytes,
+                response.status == 304,
+                response.headers.get("x-ratelimit-remaining"),
+                retry=attempt > 0,
+            )
+            SCHEDULER.observe(response.headers)
+            delay = SCHEDULER.retry_delay(attempt, response.status, response.headers, response.body)
+            if delay is None:
+                return response
+        SCHEDULER.record_retry(delay)
+        time.sleep(delay)
+        attempt += 1
+
+
+def _is_rate_limited(response: GitHubResponse) -> bool:
+    if response.status == 429:
+        return True
+    return response.status == 403 and (
+        response.headers.get("x-ratelimit-remaining") == "0"
+        or "rate limit" in response.body.decode("utf-8", errors="ignore").lower()
+    )
 
 
 def github_get(url: str) -> list[dict] | dict:
@@ -46,23 +158,29 @@ def github_get(url: str) -> list[dict] | dict:
     if TOKEN:
         headers["Authorization"] = f"Bearer {TOKEN}"
 
-    request = Request(url, headers=headers)
+    cached = HTTP_CACHE.lookup(url) if HTTP_CACHE else None
+    if HTTP_CACHE:
+        headers.update(HTTP_CACHE.conditional_headers(cached))
+
     try:
-        with urlopen(request, timeout=20) as response:
-            return json.loads(response.read().decode("utf-8"))
-    except HTTPError as error:
-        if error.code == 403:
-            body = ""
-            try:
-                body = error.read().decode("utf-8", errors="ignore")
-            except Exception:
-                body = ""
-            if "rate limit exceeded" in body.lower():
-                raise RuntimeError(f"GitHub API rate limit exceeded for {url}") from error
-        raise RuntimeError(f"GitHub API request failed for {url}: {error}") from error
-    except (HTTPError, URLError) as error:
+        response = _send("GET", url, headers, None, "core")
+    except (OSError, HTTPException) as error:
         raise RuntimeError(f"GitHub API request failed for {url}: {error}") from error
 
+    # 304 Not Modified does not count against the rate limit; serve the stored body.
+    if response.status == 304 and HTTP_CACHE and cached is not None:
+        return HTTP_CACHE.hit(url, cached)
+    if _is_rate_limited(response):
+        raise RateLimitError(f"GitHub API rate limit exceeded for {url}")
+    if response.status >= 300:
+        raise GitHubAPIError(
+            f"GitHub API request failed for {url}: HTTP Error {response.status}: {response.reason}", response.status
+        )
+    if HTTP_CACHE:
+        HTTP_CACHE.miss()
+        HTTP_CACHE.store(url, response.payload, response.headers.get("etag"), response.headers.get("last-modified"))
+    return response.payload
+
 
 def github_graphql(query: str, variables: dict) -> dict:
     headers = {
@@ -73,41 +191,108 @@ def github_graphql(query: str, variables: dict) -> dict:
     if TOKEN:
         headers["Authorization"] = f"Bearer {TOKEN}"
 
-    request = Request(
-        "https://api.github.com/graphql",
-        headers=headers,
-        data=json.dumps({"query": query, "variables": variables}).encode("utf-8"),
-        method="POST",
-    )
+    body = json.dumps({"query": query, "variables": variables}).encode("utf-8")
     try:
-        with urlopen(request, timeout=20) as response:
-            payload = json.loads(response.read().decode("utf-8"))
-    except HTTPError as error:
-        raise RuntimeError(f"GitHub GraphQL request failed: {error}") from error
-    except URLError as error:
+        response = _send("POST", f"{API_URL}/graphql", headers, body, "graphql")
+    except (OSError, HTTPException) as error:
         raise RuntimeError(f"GitHub GraphQL request failed: {error}") from error
+    if _is_rate_limited(response):
+        raise RateLimitError("GitHub GraphQL rate limit exceeded.")
+    if response.status >= 300:
+        raise RuntimeError(f"GitHub GraphQL request failed: HTTP Error {response.status}: {response.reason}")
 
+    payload = response.payload
+    if not isinstance(payload, dict):
+        raise RuntimeError("Unexpected GitHub GraphQL response format.")
     if "errors" in payload:
-        raise RuntimeError(f"GitHub GraphQL error: {payload['errors']}")
+        errors = payload["errors"]
+        if any(isinstance(error, dict) and error.get("type") == "RATE_LIMITED" for error in errors or []):
+            raise RateLimitError(f"GitHub GraphQL rate limit exceeded: {errors}")
+        raise RuntimeError(f"GitHub GraphQL error: {errors}")
     data = payload.get("data")
     if not isinstance(data, dict):
         raise RuntimeError("Unexpected GitHub GraphQL response format.")
     return data
 
 
-def fetch_repos(owner: str) -> list[dict]:
-    repos: list[dict] = []
+def rate_limit_status() -> dict[str, dict[str, int]]:
+    headers = {
+        "Accept": "application/vnd.github+json",
+        "User-Agent": "language-project-chart-bot",
+    }
+    if TOKEN:
+        headers["Authorization"] = f"Bearer {TOKEN}"
+    # Sent straight on the client, past the HTTP cache (a 304 would replay a stale budget) and the scheduler:
+    # /rate_limit is not charged, and it has to answer exactly when the scheduler would hold an exhausted budget.
+    url = f"{API_URL}/rate_limit"
+    try:
+        response = CLIENT.request("GET", url, headers, None)
+    except (OSError, HTTPException) as error:
+        raise RuntimeError(f"GitHub API request failed for {url}: {error}") from error
+    if response.status >= 300 or not isinstance(response.payload, dict):
+        raise RuntimeError(f"GitHub API request failed for {url}: HTTP Error {response.status}: {response.reason}")
+    resources = response.payload.get("resources") or {}
+    return {
+        name: {key: int(budget.get(key) or 0) for key in ("limit", "remaining", "reset")}
+        for name, budget in resources.items()
+        if name in ("core", "graphql") and isinstance(budget, dict)
+    }
+
+
+def owner_kind(owner: str) -> str:
+    key = owner.lower()
+    with _OWNER_KIND_LOCK:
+        lock = _OWNER_KIND_LOCKS.setdefault(key, threading.Lock())
+    # Several pipeline steps ask at once; the first one looks the owner up and the rest wait for its answer.
+    with lock:
+        if key in _OWNER_KINDS:
+            return _OWNER_KINDS[key]
+        kind = "user"
+        if TOKEN:
+            viewer = github_get(f"{API_URL}/user")
+            if isinstance(viewer, dict) and str(viewer.get("login", "")).lower() == key:
+                kind = "viewer"
+        if kind != "viewer":
+            profile = github_get(f"{API_URL}/users/{owner}")
+            if isinstance(profile, dict) and profile.get("type") == "Organization":
+                kind = "org"
+        _OWNER_KINDS[key] = kind
+        return kind
+
+
+def _resume_listing(owner: str, mode: str, complete_only: bool = False) -> tuple[object, list[RepoRecord], bool]:
+    resumed = SCAN_CHECKPOINTS.load(owner, mode)
+    if resumed is None or (complete_only and not resumed[2]):
+        return None, [], False
+    position, repos, complete = resumed
+    state = "complete" if complete else "partial"
+    print(f"Resuming {mode} repository listing for {owner} from a {state} checkpoint of {len(repos)} repos")
+    return position, [RepoRecord.from_dict(repo) for repo in repos], complete
+
+
+def iter_repos_rest(owner: str) -> Iterator[RepoRecord]:
+    # Only the token's own account can use /user/repos; orgs and other users have their own listings.
+    kind = owner_kind(owner)
+    use_authenticated_endpoint = kind == "viewer"
+    # Pages are offsets into a listing sorted by last update, which shifts between runs, so only a finished
+    # listing is reused. An interrupted one relists from page 1: unchanged pages come back as free 304s,
+    # and per-repo progress is already kept in the snapshot store.
+    _, repos, complete = _resume_listing(owner, "rest", complete_only=True)
+    if complete:
+        yield from repos
+        return
     page = 1
-    use_authenticated_endpoint = bool(TOKEN)
 
     while True:
         if use_authenticated_endpoint:
             url = (
-                "https://api.github.com/user/repos"
+                f"{API_URL}/user/repos"
                 f"?visibility=all&affiliation=owner&per_page=100&page={page}&sort=updated"
             )
+        elif kind == "org":
+            url = f"{API_URL}/orgs/{owner}/repos?type=all&per_page=100&page={page}&sort=updated"
         else:
-            url = f"https://api.github.com/users/{owner}/repos?per_page=100&page={page}&sort=updated"
+            url = f"{API_URL}/users/{owner}/repos?per_page=100&page={page}&sort=updated"
         payload = github_get(url)
 
         if not isinstance(payload, list):
@@ -115,125 +300,331 @@ def fetch_repos(owner: str) -> list[dict]:
         if not payload:
             break
 
+        # Reduce each page to records right away so raw repo objects never accumulate.
+        records = [record for record in (RepoRecord.from_rest(repo) for repo in payload if isinstance(repo, dict)) if record]
+        del payload
         if use_authenticated_endpoint:
-            repos.extend(
-                [
-                    repo
-                    for repo in payload
-                    if (repo.get("owner") or {}).get("login", "").lower() == owner.lower()
-                ]
-            )
-        else:
-            repos.extend(payload)
+            records = [record for record in records if record.owner_login.lower() == owner.lower()]
+        repos.extend(records)
         page += 1
+        yield from records
 
-    return repos
+    # Held until count_languages finishes, so a scan interrupted later doesn't relist.
+    SCAN_CHECKPOINTS.save(owner, "rest", page, (repo.to_dict() for repo in repos), complete=True)
 
 
-def owner_is_contributor(full_name: str, owner: str) -> bool:
-    global _FORK_RATE_LIMIT_WARNED
-    page = 1
-    owner_lc = owner.lower()
+def fetch_repos(owner: str) -> list[RepoRecord]:
+    return list(iter_repos_rest(owner))
 
-    while True:
-        url = f"https://api.github.com/repos/{full_name}/contributors?per_page=100&page={page}"
-        try:
-            payload = github_get(url)
-        except RuntimeError as error:
-            if "rate limit exceeded" in str(error).lower():
-                if not _FORK_RATE_LIMIT_WARNED:
-                    print("Warning: rate limit exceeded while checking fork contributors; skipping remaining fork checks.")
-                    _FORK_RATE_LIMIT_WARNED = True
-                return False
-            raise
 
-        if not isinstance(payload, list) or not payload:
-            return False
+REPOS_GRAPHQL_QUERY = """
+query($login: String!, $cursor: String, $languagesFirst: Int!) {
+  repositoryOwner(login: $login) {
+    login
+    repositories(first: 100, after: $cursor, ownerAffiliations: OWNER, orderBy: {field: UPDATED_AT, direction: DESC}) {
+      pageInfo {
+        hasNextPage
+        endCursor
+      }
+      nodes {
+        nameWithOwner
+        isFork
+        pushedAt
+        owner {
+          login
+        }
+        parent {
+          nameWithOwner
+        }
+        primaryLanguage {
+          name
+        }
+        languages(first: $languagesFirst, orderBy: {field: SIZE, direction: DESC}) {
+          totalCount
+          edges {
+            size
+            node {
+              name
+            }
+          }
+        }
+      }
+    }
+  }
+}
+"""
 
-        for contributor in payload:
-            login = (contributor or {}).get("login")
-            contributions = (contributor or {}).get("contributions", 0)
-            if isinstance(login, str) and login.lower() == owner_lc and contributions > 0:
-                return True
-        page += 1
 
+def iter_repos_graphql(owner: str, languages_first: int = GRAPHQL_LANGUAGES_FIRST) -> Iterator[RepoRecord]:
+    cursor, repos, complete = _resume_listing(owner, "graphql")
+    yield from repos
+    if complete:
+        return
 
-def count_languages(repos: list[dict], owner: str) -> Counter:
-    global _LANG_RATE_LIMIT_WARNED
-    counts: Counter = Counter()
+    try:
+        while True:
+            data = github_graphql(
+                REPOS_GRAPHQL_QUERY,
+                {"login": owner, "cursor": cursor, "languagesFirst": languages_first},
+            )
+            repository_owner = data.get("repositoryOwner")
+            if not isinstance(repository_owner, dict):
+                raise RuntimeError(f"GitHub GraphQL returned no repository owner for {owner}.")
+            connection = repository_owner.get("repositories") or {}
+            nodes = connection.get("nodes")
+            if not isinstance(nodes, list):
+                raise RuntimeError("Unexpected GitHub GraphQL response format while fetching repositories.")
 
-    for repo in repos:
-        if repo.get("fork"):
-            if not TOKEN:
-                continue
-            full_name = repo.get("full_name")
-            if not isinstance(full_name, str) or not owner_is_contributor(full_name, owner):
+            records = [record for record in (RepoRecord.from_graphql(node) for node in nodes if isinstance(node, dict)) if record]
+            repos.extend(records)
+            page_info = connection.get("pageInfo") or {}
+            has_next = bool(page_info.get("hasNextPage"))
+            if has_next:
+                cursor = page_info.get("endCursor")
+            yield from records
+            if not has_next:
+                break
+    except (RuntimeError, GeneratorExit):
+        # Failed or abandoned by the consumer: keep the pages already listed so the next run continues from this cursor.
+        if repos:
+            SCAN_CHECKPOINTS.save(owner, "graphql", cursor, (repo.to_dict() for repo in repos))
+        raise
+
+    SCAN_CHECKPOINTS.save(owner, "graphql", cursor, (repo.to_dict() for repo in repos), complete=True)
+
+
+def fetch_repos_graphql(owner: str, languages_first: int = GRAPHQL_LANGUAGES_FIRST) -> list[RepoRecord]:
+    return list(iter_repos_graphql(owner, languages_first))
+
+
+def listing_mode() -> str:
+    return "graphql" if SCAN_MODE == "graphql" or (SCAN_MODE == "auto" and TOKEN) else "rest"
+
+
+def iter_repos(owner: str) -> Iterator[RepoRecord]:
+    if listing_mode() == "graphql":
+        return iter_repos_graphql(owner)
+    return iter_repos_rest(owner)
+
+
+def scan_repos(owner: str) -> list[RepoRecord]:
+    return list(iter_repos(owner))
+
+
+def stream_repos(
+    owner: str, prefetch: int = REPO_PREFETCH, listing: Callable[[str], Iterator[RepoRecord]] = iter_repos
+) -> Iterator[RepoRecord]:
+    # Page through the listing on a background thread so per-repo work starts with the first page
+    # and pagination keeps going while it runs. Closing the stream early stops the producer.
+    items: queue.Queue = queue.Queue(maxsize=max(1, prefetch))
+    stop = threading.Event()
+    done = object()
+
+    def offer(item: object) -> bool:
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
                 continue
+        return False
+
+    def produce() -> None:
+        try:
+            with closing(listing(owner)) as records:
+                for record in records:
+                    if not offer(record):
+                        return
+        except BaseException as error:
+            offer(error)
+            return
+        offer(done)
 
-        full_name = repo.get("full_name")
-        detected_languages: set[str] = set()
+    producer = threading.Thread(target=produce, name=f"repo-listing-{owner}", daemon=True)
+    producer.start()
+    try:
+        while True:
+            item = items.get()
+            if item is done:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        # Let an abandoned listing finish checkpointing its pages before the caller persists state.
+        producer.join()
 
-        if isinstance(full_name, str):
+
+def _fork_verdicts() -> dict[str, dict]:
+    global _FORK_VERDICTS
+    if _FORK_VERDICTS is None:
+        _FORK_VERDICTS = {}
+        if FORK_VERDICT_CACHE.exists():
             try:
-                payload = github_get(f"https://api.github.com/repos/{full_name}/languages")
-                if isinstance(payload, dict):
-                    detected_languages = {
-                        lang for lang, byte_count in payload.items() if isinstance(lang, str) and byte_count
-                    }
-            except RuntimeError as error:
-                if "rate limit exceeded" in str(error).lower():
-                    if not _LANG_RATE_LIMIT_WARNED:
-                        print("Warning: rate limit exceeded while fetching per-repo languages; using primary-language fallback.")
-                        _LANG_RATE_LIMIT_WARNED = True
-                else:
-                    raise
-
-        if not detected_languages:
-            primary = repo.get("language")
-            detected_languages = {primary} if isinstance(primary, str) and primary else {"Other"}
-
-        for language in detected_languages:
-            counts[language] += 1
-
-    return counts
-
-
-def count_contributions_by_day(owner: str, days: int = 90) -> dict[str, int]:
-    global _COMMIT_RATE_LIMIT_WARNED
-    now_sgt = datetime.now(SGT)
-    start_day = now_sgt.date() - timedelta(days=days - 1)
-    start_dt_sgt = datetime.combine(start_day, datetime.min.time(), tzinfo=SGT)
-    from_iso = start_dt_sgt.astimezone(timezone.utc).isoformat().replace("+00:00", "Z")
-    to_iso = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
-
-    query = """
-    query($login: String!, $from: DateTime!, $to: DateTime!) {
-      user(login: $login) {
-        contributionsCollection(from: $from, to: $to) {
-          contributionCalendar {
-            weeks {
-              contributionDays {
-                date
-                contributionCount
-              }
-            }
+                loaded = json.loads(FORK_VERDICT_CACHE.read_text(encoding="utf-8"))
+            except json.JSONDecodeError:
+                loaded = {}
+            if isinstance(loaded, dict):
+                _FORK_VERDICTS = {key: value for key, value in loaded.items() if isinstance(value, dict)}
+    return _FORK_VERDICTS
+
+
+def save_fork_verdicts() -> None:
+    global _FORK_VERDICTS_DIRTY
+    with _FORK_VERDICT_LOCK:
+        if not _FORK_VERDICTS_DIRTY:
+            return
+        FORK_VERDICT_CACHE.parent.mkdir(parents=True, exist_ok=True)
+        FORK_VERDICT_CACHE.write_text(json.dumps(dict(sorted(_fork_verdicts().items())), indent=0), encoding="utf-8")
+        _FORK_VERDICTS_DIRTY = False
+
+
+def cached_fork_verdict(full_name: str, owner: str, pushed_at: str | None) -> bool | None:
+    # A fork's commit history can only change when it is pushed to, so the verdict holds until pushed_at moves.
+    if not pushed_at:
+        return None
+    with _FORK_VERDICT_LOCK:
+        cached = _fork_verdicts().get(f"{owner.lower()}:{full_name}")
+    if cached and cached.get("pushed_at") == pushed_at:
+        return bool(cached.get("contributor"))
+    return None
+
+
+def _fork_contribution(full_name: str, owner: str, pushed_at: str | None = None) -> bool:
+    global _FORK_VERDICTS_DIRTY
+    key = f"{owner.lower()}:{full_name}"
+    cached = cached_fork_verdict(full_name, owner, pushed_at)
+    if cached is not None:
+        return cached
+
+    # One author-filtered commit is enough to decide; no need to page through every upstream contributor.
+    url = f"{API_URL}/repos/{full_name}/commits?author={owner}&per_page=1"
+    try:
+        payload = github_get(url)
+    except GitHubAPIError as error:
+        # 409 Conflict: the fork has no commits at all.
+        if error.status != 409:
+            raise
+        payload = []
+
+    contributor = isinstance(payload, list) and bool(payload)
+    if pushed_at:
+        with _FORK_VERDICT_LOCK:
+            _fork_verdicts()[key] = {"pushed_at": pushed_at, "contributor": contributor}
+            _FORK_VERDICTS_DIRTY = True
+    return contributor
+
+
+def repo_snapshot(repo: RepoRecord, owner: str) -> dict:
+    cached = REPO_SNAPSHOTS.get(owner, repo.full_name, repo.pushed_at)
+    if cached is not None:
+        return cached
+
+    # RateLimitError propagates: a half-counted scan is abandoned rather than written with fallbacks,
+    # and every snapshot stored so far is reused when the scan resumes.
+    snapshot = {"pushed_at": repo.pushed_at, "language": repo.language, "languages": {}, "included": True}
+    if repo.fork:
+        snapshot["included"] = bool(TOKEN) and _fork_contribution(repo.full_name, owner, repo.pushed_at)
+
+    if snapshot["included"]:
+        if repo.languages is not None:
+            snapshot["languages"] = dict(repo.languages)
+        else:
+            payload = github_get(f"{API_URL}/repos/{repo.full_name}/languages")
+            if isinstance(payload, dict):
+                snapshot["languages"] = {
+                    lang: int(byte_count) for lang, byte_count in payload.items() if isinstance(lang, str)
+                }
+
+    # Without a token forks can't be checked, so that verdict is not worth keeping.
+    if TOKEN or not repo.fork:
+        REPO_SNAPSHOTS.put(owner, repo.full_name, snapshot)
+    return snapshot
+
+
+def _slotted_snapshot(repo: RepoRecord, owner: str) -> dict:
+    with _FETCH_SLOTS:
+        return repo_snapshot(repo, owner)
+
+
+def count_languages(
+    repos: Iterable[RepoRecord],
+    owner: str,
+    workers: int = FETCH_WORKERS,
+    mode: str = COUNTING_MODE,
+    limit: int | None = None,
+) -> Counter:
+    # Per-repo lookups are independent network round trips, so overlap them on a bounded pool.
+    # Repos are submitted as they arrive (repos may be a stream) with a bounded window in flight,
+    # and results are collected in input order, keeping the result deterministic.
+    snapshots: list[dict] = []
+    full_names: list[str] = []
+    seen: set[str] = set()
+    in_flight: deque = deque()
+    complete = True
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        try:
+            for repo in repos:
+                # A listing that shifted while it was paged can repeat a repo; count each one once.
+                if repo.full_name in seen:
+                    continue
+                if limit is not None and len(full_names) >= limit:
+                    complete = False
+                    break
+                seen.add(repo.full_name)
+                full_names.append(repo.full_name)
+                in_flight.append(executor.submit(_slotted_snapshot, repo, owner))
+                if len(in_flight) >= workers * 4:
+                    snapshots.append(in_flight.popleft().result())
+            while in_flight:
+                snapshots.append(in_flight.popleft().result())
+        except RateLimitError:
+            # Drop the queued lookups; the finished ones are already in the snapshot store.
+            executor.shutdown(cancel_futures=True)
+            raise
+        finally:
+            # Stops a streaming producer when we finish early or fail.
+            close = getattr(repos, "close", None)
+            if close is not None:
+                close()
+
+    # Only a scan that saw every repo is authoritative for the owner; a limited one leaves the checkpoint alone.
+    if complete:
+        REPO_SNAPSHOTS.record_scan(owner, full_names)
+        # The scan is complete, so the next run must list afresh.
+        SCAN_CHECKPOINTS.clear(owner)
+    return tally(snapshots, mode)
+
+
+def count_languages_from_snapshots(owner: str, mode: str = COUNTING_MODE) -> Counter:
+    snapshots = REPO_SNAPSHOTS.snapshots(owner)
+    if snapshots is None:
+        raise RuntimeError(f"No repo snapshots stored for {owner}. Run a full scan first.")
+    return tally(snapshots, mode)
+
+
+CONTRIBUTION_DAYS_FRAGMENT = """
+      contributionCalendar {
+        weeks {
+          contributionDays {
+            date
+            contributionCount
           }
         }
       }
-    }
-    """
-    try:
-        data = github_graphql(query, {"login": owner, "from": from_iso, "to": to_iso})
-    except RuntimeError as error:
-        msg = str(error).lower()
-        if "rate limit" in msg and not _COMMIT_RATE_LIMIT_WARNED:
-            print("Warning: rate limit exceeded while fetching contribution calendar; contribution metric may be partial.")
-            _COMMIT_RATE_LIMIT_WARNED = True
-        raise
+"""
+# contributionsCollection rejects ranges longer than one year.
+MAX_COLLECTION_SPAN_DAYS = 365
+
 
+def _sgt_midnight_utc_iso(day: date) -> str:
+    start_dt_sgt = datetime.combine(day, datetime.min.time(), tzinfo=SGT)
+    return start_dt_sgt.astimezone(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def _parse_contribution_weeks(collection: dict | None) -> dict[str, int]:
     contribution_counts: dict[str, int] = {}
-    user = data.get("user") if isinstance(data, dict) else None
-    collection = (user or {}).get("contributionsCollection") if isinstance(user, dict) else None
     calendar = (collection or {}).get("contributionCalendar") if isinstance(collection, dict) else None
     weeks = (calendar or {}).get("weeks") if isinstance(calendar, dict) else []
     if not isinstance(weeks, list):
@@ -250,25 +641,279 @@ def count_contributions_by_day(owner: str, days: int = 90) -> dict[str, int]:
                     contribution_counts[day] = int(count)
                 except (TypeError, ValueError):
                     contribution_counts[day] = 0
+    return contribution_counts
+
+
+def _collection_ranges(start_day: date, end_day: date) -> list[tuple[date, date, str, str]]:
+    ranges: list[tuple[date, date, str, str]] = []
+    chunk_start = start_day
+    while chunk_start <= end_day:
+        chunk_end = min(chunk_start + timedelta(days=MAX_COLLECTION_SPAN_DAYS - 1), end_day)
+        if chunk_end >= datetime.now(SGT).date():
+            to_iso = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+        else:
+            to_iso = _sgt_midnight_utc_iso(chunk_end + timedelta(days=1))
+        ranges.append((chunk_start, chunk_end, _sgt_midnight_utc_iso(chunk_start), to_iso))
+        chunk_start = chunk_end + timedelta(days=1)
+    return ranges
+
+
+def fetch_contribution_calendar(owner: str, start_day: date, end_day: date) -> dict[str, int]:
+    global _COMMIT_RATE_LIMIT_WARNED
+    chunks = _collection_ranges(start_day, end_day)
+    ranges = [(from_iso, to_iso) for _, _, from_iso, to_iso in chunks]
+    bounds = [(chunk_start.isoformat(), chunk_end.isoformat()) for chunk_start, chunk_end, _, _ in chunks]
+
+    # One aliased contributionsCollection per year-sized chunk, all in a single round trip.
+    params = ", ".join(f"$from{i}: DateTime!, $to{i}: DateTime!" for i in range(len(ranges)))
+    fields = "".join(
+        f"    c{i}: contributionsCollection(from: $from{i}, to: $to{i}) {{{CONTRIBUTION_DAYS_FRAGMENT}    }}\n"
+        for i in range(len(ranges))
+    )
+    query = f"query($login: String!, {params}) {{\n  user(login: $login) {{\n{fields}  }}\n}}"
+    variables: dict[str, str] = {"login": owner}
+    for i, (from_iso, to_iso) in enumerate(ranges):
+        variables[f"from{i}"] = from_iso
+        variables[f"to{i}"] = to_iso
+
+    try:
+        data = github_graphql(query, variables)
+    except RateLimitError:
+        if not _COMMIT_RATE_LIMIT_WARNED:
+            print("Warning: rate limit exceeded while fetching contribution calendar; contribution metric may be partial.")
+            _COMMIT_RATE_LIMIT_WARNED = True
+        raise
+
+    contribution_counts: dict[str, int] = {}
+    user = data.get("user") if isinstance(data, dict) else None
+    for i, (first_day, last_day) in enumerate(bounds):
+        collection = user.get(f"c{i}") if isinstance(user, dict) else None
+        # Calendars are week-aligned; keep only each chunk's own days so neighbours don't overwrite each other.
+        for day, count in _parse_contribution_weeks(collection).items():
+            if first_day <= day <= last_day or (i == len(bounds) - 1 and day > last_day):
+                contribution_counts[day] = count
+    return contribution_counts
+
+
+COMMIT_CONTRIBUTIONS_FRAGMENT = """
+      commitContributionsByRepository(maxRepositories: 100) {
+        contributions {
+          totalCount
+        }
+        repository {
+          nameWithOwner
+          primaryLanguage {
+            name
+          }
+          languages(first: $languagesFirst, orderBy: {field: SIZE, direction: DESC}) {
+            edges {
+              size
+              node {
+                name
+              }
+            }
+          }
+        }
+      }
+"""
+MAX_CONTRIBUTION_REPOSITORIES = 100
+
+
+def fetch_commit_contributions(
+    owner: str, windows: tuple[int, ...] = CODING_WINDOWS, languages_first: int = GRAPHQL_LANGUAGES_FIRST
+) -> dict[int, list[dict]]:
+    global _ACTIVITY_RATE_LIMIT_WARNED
+    today = datetime.now(SGT).date()
+    spans = [
+        (days, from_iso, to_iso)
+        for days in windows
+        for _, _, from_iso, to_iso in _collection_ranges(today - timedelta(days=days - 1), today)
+    ]
 
-    filtered_counts: dict[str, int] = {}
+    # Every window (and year-sized chunk of a longer one) is an aliased collection in the same request,
+    # and each repository arrives with its language bytes, so no per-repo calls are needed.
+    params = ", ".join(f"$from{i}: DateTime!, $to{i}: DateTime!" for i in range(len(spans)))
+    fields = "".join(
+        f"    w{i}: contributionsCollection(from: $from{i}, to: $to{i}) {{{COMMIT_CONTRIBUTIONS_FRAGMENT}    }}\n"
+        for i in range(len(spans))
+    )
+    query = f"query($login: String!, $languagesFirst: Int!, {params}) {{\n  user(login: $login) {{\n{fields}  }}\n}}"
+    variables: dict[str, object] = {"login": owner, "languagesFirst": languages_first}
+    for i, (_, from_iso, to_iso) in enumerate(spans):
+        variables[f"from{i}"] = from_iso
+        variables[f"to{i}"] = to_iso
+
+    try:
+        data = github_graphql(query, variables)
+    except RateLimitError:
+        if not _ACTIVITY_RATE_LIMIT_WARNED:
+            print("Warning: rate limit exceeded while fetching commit contributions; language activity was not updated.")
+            _ACTIVITY_RATE_LIMIT_WARNED = True
+        raise
+
+    user = data.get("user") if isinstance(data, dict) else None
+    by_window: dict[int, dict[str, dict]] = {days: {} for days in windows}
+    for i, (days, _, _) in enumerate(spans):
+        collection = user.get(f"w{i}") if isinstance(user, dict) else None
+        entries = (collection or {}).get("commitContributionsByRepository") if isinstance(collection, dict) else None
+        if not isinstance(entries, list):
+            continue
+        if len(entries) >= MAX_CONTRIBUTION_REPOSITORIES:
+            print(f"Warning: {days}d language activity is limited to the {MAX_CONTRIBUTION_REPOSITORIES} most active repositories.")
+        for entry in entries:
+            repository = (entry or {}).get("repository") or {}
+            full_name = repository.get("nameWithOwner")
+            if not isinstance(full_name, str):
+                continue
+            repo = by_window[days].setdefault(
+                full_name,
+                {
+                    "full_name": full_name,
+                    "contributions": 0,
+                    "language": (repository.get("primaryLanguage") or {}).get("name"),
+                    "languages": {
+                        edge["node"]["name"]: int(edge.get("size") or 0)
+                        for edge in ((repository.get("languages") or {}).get("edges") or [])
+                        if isinstance(((edge or {}).get("node") or {}).get("name"), str)
+                    },
+                },
+            )
+            repo["contributions"] += int(((entry or {}).get("contributions") or {}).get("totalCount") or 0)
+    return {days: sorted(repos.values(), key=lambda repo: repo["full_name"]) for days, repos in by_window.items()}
+
+
+def count_language_activity(owner: str, windows: tuple[int, ...] = CODING_WINDOWS) -> dict[int, dict]:
+    return {
+        days: {
+            "counts": tally_activity(repos),
+            "total_contributions": sum(repo["contributions"] for repo in repos),
+            "repositories": len(repos),
+        }
+        for days, repos in fetch_commit_contributions(owner, windows).items()
+    }
+
+
+def slice_window(daily_contribution_counts: dict[str, int], days: int, end_day: date) -> list[tuple[str, int]]:
+    start_day = end_day - timedelta(days=days - 1)
+    rows: list[tuple[str, int]] = []
     for i in range(days):
         day = (start_day + timedelta(days=i)).isoformat()
-        filtered_counts[day] = contribution_counts.get(day, 0)
+        rows.append((day, daily_contribution_counts.get(day, 0)))
+    return rows
+
+
+def activity_stats(
+    daily_contribution_counts: dict[str, int], windows: tuple[int, ...] = CODING_WINDOWS, end_day: date | None = None
+) -> dict[int, dict]:
+    end_day = end_day or datetime.now(SGT).date()
+    series = [count for _, count in slice_window(daily_contribution_counts, max(windows), end_day)]
+    return compute_activity_stats(series, end_day, windows)
+
 
-    today_sgt = now_sgt.date().isoformat()
+def load_contribution_store(owner: str, path: Path) -> ContributionStore:
+    store = ContributionStore.open(path)
+    if store is None or store.owner.lower() != owner.lower():
+        return ContributionStore(owner)
+    return store
+
+
+def count_contributions_by_day(owner: str, days: int = 90, output_dir: Path = OUTPUT_DIR) -> dict[str, int]:
+    now_sgt = datetime.now(SGT)
+    today = now_sgt.date()
+    start_day = today - timedelta(days=days - 1)
+    store_path = output_dir / CONTRIBUTION_STORE_NAME
+    store = load_contribution_store(owner, store_path)
+    last_reconciled = store.last_reconciled
+
+    # Only the trailing few days of the calendar still change, so normally refetch just those.
+    # A full pass runs when history is missing, too short, or due for periodic reconciliation.
+    reconcile_due = (
+        last_reconciled is None
+        or last_reconciled > today
+        or last_reconciled <= today - timedelta(days=CONTRIBUTION_RECONCILE_DAYS)
+    )
+    if not len(store) or store.first_day > start_day or reconcile_due:
+        fetch_start = start_day
+        store.last_reconciled = today
+    else:
+        fetch_start = today - timedelta(days=CONTRIBUTION_REFRESH_DAYS - 1)
+        fetch_start = max(start_day, min(fetch_start, store.last_day + timedelta(days=1)))
+
+    contribution_counts = fetch_contribution_calendar(owner, fetch_start, today)
+    store.update(dict(slice_window(contribution_counts, (today - fetch_start).days + 1, today)))
+    store.save(store_path)
+    filtered_counts = dict(store.window(days, today))
+
+    today_sgt = today.isoformat()
     latest_graphql_day = max(contribution_counts.keys()) if contribution_counts else "N/A"
     latest_graphql_count = contribution_counts.get(latest_graphql_day, 0) if contribution_counts else 0
+    print(f"[debug] Refreshed {(today - fetch_start).days + 1} day(s) of contribution history from {fetch_start.isoformat()}")
     print(f"[debug] GraphQL contributions for {today_sgt} SGT (window={days}d): {filtered_counts.get(today_sgt, 0)}")
     print(f"[debug] Latest GraphQL day/count (window={days}d): {latest_graphql_day} -> {latest_graphql_count}")
     return filtered_counts
 
 
-def write_outputs(owner: str, counts: Counter) -> None:
-    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-    sorted_counts = sorted(counts.items(), key=lambda item: (-item[1], item[0].lower()))
+def build_manifest(output_dir: Path) -> BuildManifest:
+    with _MANIFEST_LOCK:
+        manifest = _BUILD_MANIFESTS.get(output_dir)
+        if manifest is None:
+            manifest = BuildManifest(output_dir / BUILD_MANIFEST_NAME)
+            _BUILD_MANIFESTS[output_dir] = manifest
+        return manifest
+
+
+def save_build_manifests() -> None:
+    with _MANIFEST_LOCK:
+        manifests = list(_BUILD_MANIFESTS.values())
+    for manifest in manifests:
+        manifest.save()
+
+
+def reset_run_stats() -> None:
+    # A long-lived process (serve_charts) runs many builds; each run report covers one of them.
+    TELEMETRY.reset()
+    SCHEDULER.reset_counters()
+    if HTTP_CACHE:
+        HTTP_CACHE.reset_stats()
+
+
+def persist_run_state() -> None:
+    save_build_manifests()
+    save_fork_verdicts()
+    REPO_SNAPSHOTS.save()
+
 
-    with OUTPUT_CSV.open("w", newline="", encoding="utf-8") as f:
+def read_previous_metadata(path: Path) -> dict:
+    if not path.exists():
+        return {}
+    try:
+        metadata = json.loads(path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError:
+        return {}
+    return metadata if isinstance(metadata, dict) else {}
+
+
+def sort_counts(counts: Counter) -> list[tuple[str, int]]:
+    # Counter order follows set iteration upstream, which varies with PYTHONHASHSEED; digests need a stable order.
+    return sorted(counts.items(), key=lambda item: (-item[1], item[0].lower()))
+
+
+def write_outputs(owner: str, counts: Counter, output_dir: Path = OUTPUT_DIR, mode: str = COUNTING_MODE) -> dict:
+    output_csv = output_dir / OUTPUT_CSV.name
+    output_json = output_dir / OUTPUT_JSON.name
+    manifest = build_manifest(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    sorted_counts = sort_counts(counts)
+
+    # Same data as the last build: keep the files (and their generated_at_sgt) byte-for-byte.
+    digest = BuildManifest.digest(owner, mode, sorted_counts)
+    if manifest.is_fresh(output_csv.name, digest, (output_csv, output_json)):
+        metadata = read_previous_metadata(output_json)
+        if metadata:
+            print(f"Unchanged {output_csv} and {output_json}")
+            return metadata
+
+    with output_csv.open("w", newline="", encoding="utf-8") as f:
         writer = csv.writer(f)
         writer.writerow(["language", "count"])
         writer.writerows(sorted_counts)
@@ -276,64 +921,172 @@ def write_outputs(owner: str, counts: Counter) -> None:
     metadata = {
         "owner": owner,
         "generated_at_sgt": datetime.now(SGT).isoformat(),
-        "counting_mode": "repo_presence",
-        "total_counted_repos": sum(counts.values()),
-        "csv_file": OUTPUT_CSV.name,
+        "counting_mode": mode,
+        ("total_bytes" if mode == "bytes" else "total_counted_repos"): sum(counts.values()),
+        "csv_file": output_csv.name,
     }
-    OUTPUT_JSON.write_text(json.dumps(metadata, indent=2), encoding="utf-8")
+    output_json.write_text(json.dumps(metadata, indent=2), encoding="utf-8")
 
-    print(f"Saved {OUTPUT_CSV} and {OUTPUT_JSON}")
+    manifest.record(output_csv.name, digest)
+    print(f"Saved {output_csv} and {output_json}")
+    return metadata
 
 
-def write_coding_outputs(owner: str, daily_contribution_counts: dict[str, int], days: int) -> None:
-    coding_csv = OUTPUT_DIR / f"coding-days-{days}d.csv"
-    coding_json = OUTPUT_DIR / f"coding-days-{days}d.json"
-    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-    now_sgt = datetime.now(SGT)
-    start_day = now_sgt.date() - timedelta(days=days - 1)
-    rows: list[tuple[str, int]] = []
-    for i in range(days):
-        day = (start_day + timedelta(days=i)).isoformat()
-        rows.append((day, daily_contribution_counts.get(day, 0)))
+def _activity_windows(owner: str, rows: dict[int, list[tuple[str, int]]], metadata: dict) -> dict[int, tuple[list[tuple[str, int]], dict]]:
+    windows = metadata.get("windows") or {}
+    return {
+        days: (
+            window_rows,
+            {
+                "owner": owner,
+                "generated_at_sgt": metadata.get("generated_at_sgt"),
+                "window_days": days,
+                **windows.get(str(days), {}),
+            },
+        )
+        for days, window_rows in rows.items()
+    }
+
+
+def write_activity_outputs(
+    owner: str, activity: dict[int, dict], output_dir: Path = OUTPUT_DIR
+) -> dict[int, tuple[list[tuple[str, int]], dict]]:
+    activity_csv = output_dir / ACTIVITY_CSV.name
+    activity_json = output_dir / ACTIVITY_JSON.name
+    manifest = build_manifest(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    rows = {
+        days: sort_counts(window["counts"])
+        for days, window in sorted(activity.items())
+    }
+    windows = {
+        str(days): {"total_contributions": window["total_contributions"], "repositories": window["repositories"]}
+        for days, window in sorted(activity.items())
+    }
+
+    digest = BuildManifest.digest(owner, rows, windows)
+    if manifest.is_fresh(activity_csv.name, digest, (activity_csv, activity_json)):
+        metadata = read_previous_metadata(activity_json)
+        if metadata:
+            print(f"Unchanged {activity_csv} and {activity_json}")
+            return _activity_windows(owner, rows, metadata)
+
+    with activity_csv.open("w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["window_days", "language", "count"])
+        for days, window_rows in rows.items():
+            writer.writerows((days, language, count) for language, count in window_rows)
+
+    metadata = {
+        "owner": owner,
+        "generated_at_sgt": datetime.now(SGT).isoformat(),
+        "counting_mode": "commit_activity",
+        "windows": windows,
+        "csv_file": activity_csv.name,
+    }
+    activity_json.write_text(json.dumps(metadata, indent=2), encoding="utf-8")
+    manifest.record(activity_csv.name, digest)
+    print(f"Saved {activity_csv} and {activity_json}")
+    return _activity_windows(owner, rows, metadata)
+
+
+def write_coding_outputs(
+    owner: str,
+    daily_contribution_counts: dict[str, int],
+    days: int,
+    output_dir: Path = OUTPUT_DIR,
+    stats: dict | None = None,
+) -> tuple[list[tuple[str, int]], dict]:
+    coding_csv = output_dir / f"coding-days-{days}d.csv"
+    coding_json = output_dir / f"coding-days-{days}d.json"
+    manifest = build_manifest(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    end_day = datetime.now(SGT).date()
+    rows = slice_window(daily_contribution_counts, days, end_day)
+    if stats is None:
+        stats = activity_stats(daily_contribution_counts, (days,), end_day)[days]
+
+    digest = BuildManifest.digest(owner, days, rows, stats)
+    if manifest.is_fresh(coding_csv.name, digest, (coding_csv, coding_json)):
+        metadata = read_previous_metadata(coding_json)
+        if metadata:
+            print(f"Unchanged {coding_csv} and {coding_json}")
+            return rows, metadata
 
     with coding_csv.open("w", newline="", encoding="utf-8") as f:
         writer = csv.writer(f)
         writer.writerow(["date", "contribution_count"])
         writer.writerows(rows)
 
-    coded_days = sum(1 for _, count in rows if count > 0)
-    total_contributions = sum(count for _, count in rows)
-    percent = round((coded_days / days) * 100, 1) if days else 0.0
-
     metadata = {
         "owner": owner,
         "generated_at_sgt": datetime.now(SGT).isoformat(),
-        "window_days": days,
-        "coded_days": coded_days,
-        "coded_days_percent": percent,
-        "total_contributions": total_contributions,
+        **stats,
         "csv_file": coding_csv.name,
     }
     coding_json.write_text(json.dumps(metadata, indent=2), encoding="utf-8")
+    manifest.record(coding_csv.name, digest)
     print(f"Saved {coding_csv} and {coding_json}")
+    return rows, metadata
+
+
+def write_run_report(output_dir: Path = OUTPUT_DIR, extra: dict | None = None) -> None:
+    path = output_dir / RUN_REPORT_NAME
+    TELEMETRY.write_report(
+        path,
+        datetime.now(SGT),
+        {
+            "rate_limit": SCHEDULER.report(),
+            "http_cache": HTTP_CACHE.stats() if HTTP_CACHE else None,
+            **(extra or {}),
+        },
+    )
+    print(f"Saved {path}")
+
+
+def print_run_stats() -> None:
+    for resource, budget in SCHEDULER.report().items():
+        print(
+            f"Rate limit [{resource}]: {budget['consumed']} consumed, "
+            f"{budget['remaining']}/{budget['limit']} remaining"
+        )
+    if SCHEDULER.retries:
+        print(f"Retried {SCHEDULER.retries} request(s); waited {SCHEDULER.waited:.1f}s in total for pacing and backoff")
+    if HTTP_CACHE:
+        stats = HTTP_CACHE.stats()
+        print(
+            f"HTTP cache: {stats['hits']} hits, {stats['misses']} misses, "
+            f"{stats['entries']} entries ({stats['bytes'] / 1024:.1f} KiB)"
+        )
 
 
 def main() -> None:
+    if "--from-snapshots" in sys.argv[1:]:
+        # Recount from the stored per-repo language bytes, e.g. after changing COUNTING_MODE; no API calls.
+        write_outputs(OWNER, count_languages_from_snapshots(OWNER))
+        return
+
     try:
-        repos = fetch_repos(OWNER)
-        counts = count_languages(repos, OWNER)
-    except RuntimeError as error:
-        msg = str(error).lower()
-        if "rate limit exceeded" in msg:
-            raise RuntimeError(
-                "GitHub API rate limit exceeded. Ensure GH_TOKEN is set (PAT) to include private repos reliably."
-            ) from error
-        raise
+        counts = count_languages(stream_repos(OWNER), OWNER)
+    except RateLimitError as error:
+        # Keep the listing checkpoint and finished snapshots for the next run; existing outputs stay as they are.
+        persist_run_state()
+        raise RateLimitError(
+            "GitHub API rate limit exceeded; progress was checkpointed and the next run resumes from it. "
+            "Ensure GH_TOKEN is set (PAT) to include private repos reliably."
+        ) from error
 
     write_outputs(OWNER, counts)
-    for window_days in (90, 180, 365):
-        contribution_counts = count_contributions_by_day(OWNER, days=window_days)
-        write_coding_outputs(OWNER, contribution_counts, days=window_days)
+    # Fetch the widest window once; every configured window is a slice of it.
+    contribution_counts = count_contributions_by_day(OWNER, days=max(CODING_WINDOWS))
+    stats = activity_stats(contribution_counts)
+    for window_days in CODING_WINDOWS:
+        write_coding_outputs(OWNER, contribution_counts, days=window_days, stats=stats[window_days])
+    write_activity_outputs(OWNER, count_language_activity(OWNER))
+
+    persist_run_state()
+    write_run_report()
+    print_run_stats()
 
 
 if __name__ == "__main__":
@@ -1,24 +1,243 @@
-import subprocess
+import os
 import sys
+import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from pathlib import Path
 
+import fetch_language_counts as fetch
+import render_coding_days_chart
+import render_language_project_chart
+import request_budget
+from build_manifest import BuildManifest
+from profiling import PROFILER
+from rate_limit import RateLimitError
+from repo_record import RepoRecord
 
-SCRIPT_DIR = Path(__file__).resolve().parent
 
+PIPELINE_WORKERS = max(1, int(os.environ.get("PIPELINE_WORKERS", "4")))
 
-def run(script_name: str, *args: str) -> None:
-    script_path = SCRIPT_DIR / script_name
-    result = subprocess.run([sys.executable, str(script_path), *args], check=False)
-    if result.returncode != 0:
-        raise SystemExit(result.returncode)
+Step = tuple[tuple[str, ...], Callable[[dict], object]]
+
+
+def run_pipeline(steps: dict[str, Step], workers: int = PIPELINE_WORKERS) -> tuple[dict, dict[str, tuple[float, float]]]:
+    results: dict = {}
+    timings: dict[str, tuple[float, float]] = {}
+    pending = dict(steps)
+    running: dict[Future, str] = {}
+    pipeline_start = time.perf_counter()
+
+    def timed(name: str, fn: Callable[[dict], object]) -> object:
+        started = time.perf_counter()
+        try:
+            return fn(results)
+        finally:
+            timings[name] = (started - pipeline_start, time.perf_counter() - started)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        while pending or running:
+            # Launch every step whose dependencies have all produced results.
+            for name, (deps, fn) in list(pending.items()):
+                unknown = [dep for dep in deps if dep not in steps]
+                if unknown:
+                    raise RuntimeError(f"Pipeline step {name} depends on unknown step(s): {', '.join(unknown)}")
+                if all(dep in results for dep in deps):
+                    running[executor.submit(timed, name, fn)] = name
+                    del pending[name]
+            if not running:
+                raise RuntimeError(f"Pipeline has a dependency cycle among: {', '.join(pending)}")
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                error = future.exception()
+                if error is not None:
+                    for other in running:
+                        other.cancel()
+                    raise error
+                results[name] = future.result()
+
+    return results, timings
+
+
+def print_timings(timings: dict[str, tuple[float, float]]) -> None:
+    width = max((len(name) for name in timings), default=4)
+    print(f"{'step':<{width}}  {'start':>8}  {'elapsed':>8}")
+    for name, (start, elapsed) in sorted(timings.items(), key=lambda item: item[1][0]):
+        print(f"{name:<{width}}  {start:>7.2f}s  {elapsed:>7.2f}s")
+
+
+def render_if_changed(render_fn: Callable[..., None], output_svg: Path, *inputs: object) -> bool:
+    # Key the SVG on its in-memory inputs plus the renderer source, so unchanged data skips rendering.
+    source = Path(render_fn.__code__.co_filename)
+    digest = BuildManifest.digest(*inputs, sources=(source,))
+    manifest = fetch.build_manifest(output_svg.parent)
+    if manifest.is_fresh(output_svg.name, digest, (output_svg,)):
+        print(f"Unchanged {output_svg}")
+        return False
+    render_fn(*inputs, output_svg)
+    manifest.record(output_svg.name, digest)
+    return True
+
+
+def build_steps(
+    owner: str, output_dir: Path = fetch.OUTPUT_DIR, prefix: str = "", plan: dict | None = None
+) -> dict[str, Step]:
+    def list_repos(owner: str) -> Iterator[RepoRecord]:
+        # Runs on the listing producer thread, so it gets its own stage (and cProfile dump) there.
+        # Its wall time includes waits on a full prefetch queue.
+        with PROFILER.stage(f"{prefix}languages.fetch_repos"):
+            yield from fetch.iter_repos(owner)
+
+    def languages(results: dict) -> tuple[list[tuple[str, int]], dict]:
+        with PROFILER.stage(f"{prefix}languages.count_languages"):
+            if plan is not None:
+                # The planner already listed the repos and ordered them for the remaining budget.
+                counts = request_budget.count_languages_within_budget(owner, plan)
+            else:
+                # Counting starts with the first listing page; pagination continues on a producer thread.
+                listing = list_repos if PROFILER.enabled else fetch.iter_repos
+                counts = fetch.count_languages(fetch.stream_repos(owner, listing=listing), owner)
+        with PROFILER.stage(f"{prefix}languages.write_outputs"):
+            return fetch.sort_counts(counts), fetch.write_outputs(owner, counts, output_dir)
+
+    def contributions(results: dict) -> dict[int, tuple[list[tuple[str, int]], dict]]:
+        # Organizations have no contribution calendar.
+        if fetch.owner_kind(owner) == "org":
+            return {}
+        with PROFILER.stage(f"{prefix}contributions.fetch"):
+            series = fetch.count_contributions_by_day(owner, days=max(fetch.CODING_WINDOWS), output_dir=output_dir)
+        with PROFILER.stage(f"{prefix}contributions.activity_stats"):
+            stats = fetch.activity_stats(series)
+        with PROFILER.stage(f"{prefix}contributions.write_outputs"):
+            return {
+                days: fetch.write_coding_outputs(owner, series, days=days, output_dir=output_dir, stats=stats[days])
+                for days in fetch.CODING_WINDOWS
+            }
+
+    def language_activity(results: dict) -> dict[int, tuple[list[tuple[str, int]], dict]]:
+        # commitContributionsByRepository lives on the user's contribution collection, like the calendar.
+        if fetch.owner_kind(owner) == "org":
+            return {}
+        with PROFILER.stage(f"{prefix}language_activity.fetch"):
+            activity = fetch.count_language_activity(owner)
+        with PROFILER.stage(f"{prefix}language_activity.write_outputs"):
+            return fetch.write_activity_outputs(owner, activity, output_dir)
+
+    def render_activity(results: dict, days: int) -> bool:
+        window = results[f"{prefix}language_activity"].get(days)
+        if window is None:
+            return False
+        return render_if_changed(
+            render_language_project_chart.render_activity, output_dir / f"language-activity-{days}d.svg", *window
+        )
+
+    def render_coding(results: dict, days: int) -> bool:
+        window = results[f"{prefix}contributions"].get(days)
+        if window is None:
+            return False
+        return render_if_changed(render_coding_days_chart.render, output_dir / f"coding-days-{days}d.svg", *window)
+
+    steps: dict[str, Step] = {
+        f"{prefix}languages": ((), languages),
+        f"{prefix}contributions": ((), contributions),
+        f"{prefix}language_activity": ((), language_activity),
+        f"{prefix}render_languages": (
+            (f"{prefix}languages",),
+            lambda results: render_if_changed(
+                render_language_project_chart.render,
+                output_dir / "language-project-chart.svg",
+                *results[f"{prefix}languages"],
+            ),
+        ),
+    }
+    for days in fetch.CODING_WINDOWS:
+        steps[f"{prefix}render_coding_{days}d"] = (
+            (f"{prefix}contributions",),
+            lambda results, days=days: render_coding(results, days),
+        )
+        steps[f"{prefix}render_language_activity_{days}d"] = (
+            (f"{prefix}language_activity",),
+            lambda results, days=days: render_activity(results, days),
+        )
+    return steps
+
+
+def build_batch_steps(
+    owners: list[str], output_root: Path = fetch.OUTPUT_DIR, plan: dict | None = None
+) -> dict[str, Step]:
+    # All owners share one graph, so their fetches interleave on the same client, cache and scheduler.
+    steps: dict[str, Step] = {}
+    for owner in owners:
+        steps.update(build_steps(owner, output_root / owner.lower(), prefix=f"{owner}:", plan=plan))
+    return steps
+
+
+def parse_owners(argv: list[str]) -> list[str]:
+    raw = ",".join(argv) if argv else os.environ.get("GITHUB_OWNERS", "")
+    owners: list[str] = []
+    for value in raw.split(","):
+        owner = value.strip()
+        if owner and owner.lower() not in {known.lower() for known in owners}:
+            owners.append(owner)
+    return owners
+
+
+def generate(
+    owners: list[str], output_root: Path = fetch.OUTPUT_DIR, plan_budget: bool = request_budget.BUDGET_PLANNING
+) -> dict[str, tuple[float, float]]:
+    fetch.reset_run_stats()
+    plan = None
+    if plan_budget:
+        plan = request_budget.plan_run(owners or [fetch.OWNER])
+        request_budget.print_plan(plan)
+        if plan["exhausted"]:
+            raise RateLimitError(f"GitHub API rate limit exhausted ({', '.join(plan['exhausted'])}); nothing was fetched.")
+    if owners:
+        steps = build_batch_steps(owners, output_root, plan)
+        workers = min(32, PIPELINE_WORKERS * len(owners))
+    else:
+        steps = build_steps(fetch.OWNER, output_root, plan=plan)
+        workers = PIPELINE_WORKERS
+    if PROFILER.enabled:
+        # Stages share one process-wide CPU clock and tracemalloc peak, so run them one at a time.
+        steps = {name: (deps, PROFILER.wrap(name, fn)) for name, (deps, fn) in steps.items()}
+        workers = 1
+    try:
+        _, timings = run_pipeline(steps, workers)
+    finally:
+        # Also on failure: snapshots and fork verdicts fetched before a rate limit let the next run resume.
+        fetch.persist_run_state()
+    step_timings = {
+        name: {"start_s": round(start, 4), "elapsed_s": round(elapsed, 4)} for name, (start, elapsed) in timings.items()
+    }
+    extra: dict = {"steps": step_timings}
+    if plan is not None:
+        extra["budget_plan"] = request_budget.summary(plan)
+    if PROFILER.enabled:
+        extra["profile"] = PROFILER.summary()
+        print(f"Saved {PROFILER.write_summary()}")
+    fetch.write_run_report(output_root, extra=extra)
+    return timings
 
 
 def main() -> None:
-    run("fetch_language_counts.py")
-    run("render_language_project_chart.py")
-    run("render_coding_days_chart.py", "90")
-    run("render_coding_days_chart.py", "180")
-    run("render_coding_days_chart.py", "365")
+    argv = sys.argv[1:]
+    if "--profile" in argv or "--cprofile" in argv:
+        PROFILER.enabled = True
+        PROFILER.cprofile = PROFILER.cprofile or "--cprofile" in argv
+        argv = [arg for arg in argv if arg not in ("--profile", "--cprofile")]
+    if "--dry-run" in argv:
+        # Lists repos and estimates the rest; writes no outputs and leaves no new listing checkpoint.
+        owners = parse_owners([arg for arg in argv if arg != "--dry-run"])
+        request_budget.print_plan(request_budget.plan_run(owners or [fetch.OWNER], dry_run=True))
+        fetch.persist_run_state()
+        return
+    timings = generate(parse_owners(argv))
+    fetch.print_run_stats()
+    print_timings(timings)
+    if PROFILER.enabled:
+        PROFILER.print_summary()
 
 
 if __name__ == "__main__":
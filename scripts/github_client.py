@@ -0,0 +1,120 @@
+import gzip
+import http.client
+import json
+import queue
+import threading
+from urllib.parse import urlsplit
+
+
+class GitHubAPIError(RuntimeError):
+    def __init__(self, message: str, status: int) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+class GitHubResponse:
+    def __init__(
+        self, status: int, reason: str, headers: dict[str, str], payload: object, body: bytes, wire_bytes: int = 0
+    ) -> None:
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.payload = payload
+        self.body = body
+        self.wire_bytes = wire_bytes
+
+
+class GitHubClient:
+    def __init__(self, timeout: float = 20, max_connections: int = 8, user_agent: str = "language-project-chart-bot") -> None:
+        self.timeout = timeout
+        self.max_connections = max(1, max_connections)
+        self.user_agent = user_agent
+        self.connections_opened = 0
+        self._pools: dict[tuple[str, str], queue.LifoQueue] = {}
+        self._lock = threading.Lock()
+
+    def _pool(self, scheme: str, netloc: str) -> queue.LifoQueue:
+        with self._lock:
+            pool = self._pools.get((scheme, netloc))
+            if pool is None:
+                pool = queue.LifoQueue(maxsize=self.max_connections)
+                self._pools[(scheme, netloc)] = pool
+            return pool
+
+    def _connect(self, scheme: str, netloc: str) -> http.client.HTTPConnection:
+        with self._lock:
+            self.connections_opened += 1
+        if scheme == "http":
+            return http.client.HTTPConnection(netloc, timeout=self.timeout)
+        return http.client.HTTPSConnection(netloc, timeout=self.timeout)
+
+    def _release(self, pool: queue.LifoQueue, connection: http.client.HTTPConnection) -> None:
+        try:
+            pool.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+    def close(self) -> None:
+        with self._lock:
+            pools = list(self._pools.values())
+            self._pools.clear()
+        for pool in pools:
+            while True:
+                try:
+                    pool.get_nowait().close()
+                except queue.Empty:
+                    break
+
+    def request(self, method: str, url: str, headers: dict[str, str], body: bytes | None = None) -> GitHubResponse:
+        parts = urlsplit(url)
+        target = parts.path or "/"
+        if parts.query:
+            target = f"{target}?{parts.query}"
+        request_headers = {
+            "User-Agent": self.user_agent,
+            "Accept-Encoding": "gzip",
+            "Connection": "keep-alive",
+            **headers,
+        }
+        pool = self._pool(parts.scheme, parts.netloc)
+
+        # A pooled connection may have been closed by the server while idle; retry once on a fresh one.
+        for attempt in range(2):
+            try:
+                connection = pool.get_nowait()
+                reused = True
+            except queue.Empty:
+                connection = self._connect(parts.scheme, parts.netloc)
+                reused = False
+            try:
+                connection.request(method, target, body=body, headers=request_headers)
+                response = connection.getresponse()
+                result = self._read(response)
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError, http.client.BadStatusLine):
+                connection.close()
+                if reused and attempt == 0:
+                    continue
+                raise
+            except BaseException:
+                connection.close()
+                raise
+            if response.will_close:
+                connection.close()
+            else:
+                self._release(pool, connection)
+            return result
+        raise RuntimeError(f"GitHub API request failed for {url}: connection retry exhausted")
+
+    def _read(self, response: http.client.HTTPResponse) -> GitHubResponse:
+        headers = {key.lower(): value for key, value in response.getheaders()}
+        raw = response.read()
+        body = gzip.decompress(raw) if headers.get("content-encoding", "").lower() == "gzip" else raw
+
+        payload: object = None
+        content_type = headers.get("content-type", "")
+        if 200 <= response.status < 300 and "json" in content_type:
+            # API pages are at most 100 items and are reduced to records right away; one parse is enough.
+            payload = json.loads(body)
+            body = b""
+        wire_bytes = len(raw)
+        return GitHubResponse(response.status, response.reason, headers, payload, body, wire_bytes)
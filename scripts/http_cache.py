@@ -0,0 +1,129 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+
+class ResponseCache:
+    def __init__(self, directory: Path, max_bytes: int, namespace: str = "") -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.namespace = namespace
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._sizes: dict[Path, int] | None = None
+
+    def _path_for(self, url: str) -> Path:
+        digest = hashlib.sha256(f"{self.namespace}\n{url}".encode("utf-8")).hexdigest()
+        return self.directory / f"{digest}.json"
+
+    def _index(self) -> dict[Path, int]:
+        if self._sizes is None:
+            self._sizes = {}
+            if self.directory.exists():
+                for path in self.directory.glob("*.json"):
+                    try:
+                        self._sizes[path] = path.stat().st_size
+                    except OSError:
+                        continue
+        return self._sizes
+
+    def lookup(self, url: str) -> dict | None:
+        path = self._path_for(url)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return None
+        if not isinstance(entry, dict) or entry.get("url") != url or "body" not in entry:
+            return None
+        return entry
+
+    def conditional_headers(self, entry: dict | None) -> dict[str, str]:
+        headers: dict[str, str] = {}
+        if not entry:
+            return headers
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def hit(self, url: str, entry: dict) -> list[dict] | dict:
+        path = self._path_for(url)
+        with self._lock:
+            self.hits += 1
+        try:
+            # Touch so eviction treats the entry as recently used.
+            os.utime(path, None)
+        except OSError:
+            pass
+        return entry["body"]
+
+    def miss(self) -> None:
+        with self._lock:
+            self.misses += 1
+
+    def store(self, url: str, body: list[dict] | dict, etag: str | None, last_modified: str | None) -> None:
+        if not etag and not last_modified:
+            return
+        path = self._path_for(url)
+        entry = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "stored_at": time.time(),
+            "body": body,
+        }
+        data = json.dumps(entry, separators=(",", ":")).encode("utf-8")
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+            tmp_path.write_bytes(data)
+            tmp_path.replace(path)
+            self._index()[path] = len(data)
+            self.stores += 1
+            self._evict()
+
+    def _evict(self) -> None:
+        sizes = self._index()
+        total = sum(sizes.values())
+        if total <= self.max_bytes:
+            return
+
+        def last_used(path: Path) -> float:
+            try:
+                return path.stat().st_mtime
+            except OSError:
+                return 0.0
+
+        for path in sorted(sizes, key=last_used):
+            if total <= self.max_bytes:
+                break
+            total -= sizes.pop(path)
+            try:
+                path.unlink()
+            except OSError:
+                pass
+            self.evictions += 1
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.hits = self.misses = self.stores = self.evictions = 0
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "stores": self.stores,
+                "evictions": self.evictions,
+                "entries": len(self._index()),
+                "bytes": sum(self._index().values()),
+            }
@@ -0,0 +1,25 @@
+from collections import Counter
+from collections.abc import Iterable
+
+
+def split_contributions(count: int, languages: dict[str, int] | None, primary: str | None = None) -> dict[str, int]:
+    sizes = {name: size for name, size in (languages or {}).items() if size > 0}
+    if count <= 0:
+        return {}
+    if not sizes:
+        return {primary or "Other": count}
+    total = sum(sizes.values())
+    shares = {name: count * size / total for name, size in sizes.items()}
+    split = {name: int(share) for name, share in shares.items()}
+    # Largest-remainder rounding: whole counts per language that still add up to the repo's contributions.
+    leftover = count - sum(split.values())
+    for name in sorted(shares, key=lambda name: (split[name] - shares[name], name))[:leftover]:
+        split[name] += 1
+    return {name: value for name, value in split.items() if value}
+
+
+def tally_activity(repos: Iterable[dict]) -> Counter:
+    counts: Counter = Counter()
+    for repo in repos:
+        counts.update(split_contributions(int(repo.get("contributions") or 0), repo.get("languages"), repo.get("language")))
+    return counts
@@ -0,0 +1,131 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import re
+import threading
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROFILE = os.environ.get("PROFILE", "0") == "1"
+PROFILE_CPROFILE = os.environ.get("PROFILE_CPROFILE", "0") == "1"
+PROFILE_DIR = Path(os.environ.get("PROFILE_DIR", SCRIPT_DIR.parent / ".cache" / "profiles"))
+PROFILE_TOP_FUNCTIONS = 40
+
+
+class StageProfiler:
+    def __init__(self, enabled: bool = False, cprofile: bool = False, output_dir: Path = PROFILE_DIR) -> None:
+        self.enabled = enabled
+        self.cprofile = cprofile
+        self.output_dir = output_dir
+        self.stages: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def start(self) -> None:
+        if self.enabled and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        if not self.enabled:
+            yield
+            return
+        self.start()
+        with self._lock:
+            # Registered on entry so the summary lists enclosing stages before the stages inside them.
+            self.stages.setdefault(name, {"calls": 0, "wall_s": 0.0, "cpu_s": 0.0, "peak_bytes": 0, "retained_bytes": 0})
+        stack: list[list[int]] = self._local.__dict__.setdefault("stack", [])
+        # tracemalloc has one peak counter, so fold the running peak into the enclosing stage before resetting it.
+        if stack:
+            stack[-1][0] = max(stack[-1][0], tracemalloc.get_traced_memory()[1])
+        baseline, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        stack.append([0])
+        # cProfile allows one active profiler per thread, so only outermost stages get a dump.
+        profiler = cProfile.Profile() if self.cprofile and len(stack) == 1 else None
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            current, peak = tracemalloc.get_traced_memory()
+            peak = max(stack.pop()[0], peak)
+            if stack:
+                stack[-1][0] = max(stack[-1][0], peak)
+            tracemalloc.reset_peak()
+            self._record(name, wall, cpu, max(0, peak - baseline), current - baseline, profiler)
+
+    def wrap(self, name: str, fn: Callable[..., object]) -> Callable[..., object]:
+        if not self.enabled:
+            return fn
+
+        def profiled(*args: object, **kwargs: object) -> object:
+            with self.stage(name):
+                return fn(*args, **kwargs)
+
+        return profiled
+
+    def _record(self, name: str, wall: float, cpu: float, peak: int, retained: int, profiler: cProfile.Profile | None) -> None:
+        with self._lock:
+            stats = self.stages[name]
+            stats["calls"] += 1
+            stats["wall_s"] += wall
+            stats["cpu_s"] += cpu
+            stats["peak_bytes"] = max(stats["peak_bytes"], peak)
+            stats["retained_bytes"] += retained
+        if profiler is not None:
+            self._dump(name, profiler)
+
+    def _dump(self, name: str, profiler: cProfile.Profile) -> None:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        stem = re.sub(r"[^A-Za-z0-9_.-]+", "_", name)
+        profiler.dump_stats(self.output_dir / f"{stem}.prof")
+        # A plain-text top list next to the binary dump, so two runs can be compared with diff.
+        text = io.StringIO()
+        pstats.Stats(profiler, stream=text).strip_dirs().sort_stats("cumulative").print_stats(PROFILE_TOP_FUNCTIONS)
+        (self.output_dir / f"{stem}.txt").write_text(text.getvalue(), encoding="utf-8")
+
+    def summary(self) -> dict[str, dict]:
+        with self._lock:
+            return {
+                name: {
+                    "calls": stats["calls"],
+                    "wall_s": round(stats["wall_s"], 4),
+                    "cpu_s": round(stats["cpu_s"], 4),
+                    "peak_mib": round(stats["peak_bytes"] / (1024 * 1024), 3),
+                    "retained_mib": round(stats["retained_bytes"] / (1024 * 1024), 3),
+                }
+                for name, stats in self.stages.items()
+            }
+
+    def write_summary(self) -> Path:
+        path = self.output_dir / "profile-summary.json"
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.summary(), indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        return path
+
+    def print_summary(self) -> None:
+        summary = self.summary()
+        width = max((len(name) for name in summary), default=5)
+        print(f"{'stage':<{width}}  {'calls':>5}  {'wall':>9}  {'cpu':>9}  {'peak MiB':>9}  {'kept MiB':>9}")
+        for name, stats in summary.items():
+            print(
+                f"{name:<{width}}  {stats['calls']:>5}  {stats['wall_s']:>8.3f}s  {stats['cpu_s']:>8.3f}s"
+                f"  {stats['peak_mib']:>9.3f}  {stats['retained_mib']:>9.3f}"
+            )
+
+
+PROFILER = StageProfiler(enabled=PROFILE or PROFILE_CPROFILE, cprofile=PROFILE_CPROFILE)
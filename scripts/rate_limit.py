@@ -0,0 +1,147 @@
+import random
+import threading
+import time
+
+
+RETRYABLE_STATUSES = {500, 502, 503, 504}
+
+
+class RateLimitError(RuntimeError):
+    pass
+
+
+class RateLimitScheduler:
+    def __init__(
+        self,
+        max_rps: float = 10.0,
+        burst: int = 10,
+        max_retries: int = 4,
+        max_wait: float = 900.0,
+        backoff_base: float = 1.0,
+        backoff_cap: float = 60.0,
+    ) -> None:
+        self.max_rps = max_rps
+        self.burst = max(1, burst)
+        self.max_retries = max_retries
+        self.max_wait = max_wait
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.retries = 0
+        self.waited = 0.0
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._budgets: dict[str, dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, resource: str) -> None:
+        delay = 0.0
+        with self._lock:
+            budget = self._budgets.get(resource)
+            if budget and budget["remaining"] <= 0:
+                until_reset = budget["reset"] - time.time()
+                if until_reset > self.max_wait:
+                    raise RateLimitError(
+                        f"GitHub API rate limit exceeded for {resource}; resets in {int(until_reset)}s"
+                    )
+                if until_reset > -1:
+                    # Closed until the window resets: every caller sleeps until then, not just the first.
+                    delay = until_reset + 1
+                else:
+                    # The window has reset; reopen it and let the next response headers correct the count.
+                    budget["remaining"] = max(1, budget["limit"])
+
+            if self.max_rps > 0:
+                now = time.monotonic()
+                self._tokens = min(float(self.burst), self._tokens + (now - self._updated) * self.max_rps)
+                self._updated = now
+                # Reserve the token now (possibly going negative) and sleep off the debt outside the lock.
+                self._tokens -= 1
+                if self._tokens < 0:
+                    delay = max(delay, -self._tokens / self.max_rps)
+            self.waited += delay
+        if delay > 0:
+            time.sleep(delay)
+
+    def observe(self, headers: dict[str, str]) -> None:
+        try:
+            remaining = int(headers["x-ratelimit-remaining"])
+            reset = int(headers.get("x-ratelimit-reset", "0"))
+        except (KeyError, ValueError):
+            return
+        try:
+            limit = int(headers.get("x-ratelimit-limit", "0"))
+        except ValueError:
+            limit = 0
+        resource = headers.get("x-ratelimit-resource", "core")
+        with self._lock:
+            budget = self._budgets.get(resource)
+            if budget is None:
+                self._budgets[resource] = {
+                    "limit": limit,
+                    "remaining": remaining,
+                    "reset": reset,
+                    "consumed": 1,
+                    "lowest": remaining,
+                }
+                return
+            if reset > budget["reset"]:
+                # A new window started: bank what the old one used.
+                budget["consumed"] += 1
+                budget["lowest"] = remaining
+            elif remaining < budget["lowest"]:
+                budget["consumed"] += budget["lowest"] - remaining
+                budget["lowest"] = remaining
+            budget.update(limit=limit or budget["limit"], remaining=remaining, reset=max(reset, budget["reset"]))
+
+    def retry_delay(self, attempt: int, status: int, headers: dict[str, str], body: bytes) -> float | None:
+        if attempt >= self.max_retries:
+            return None
+        backoff = min(self.backoff_cap, self.backoff_base * (2**attempt)) * random.uniform(0.5, 1.0)
+        if status in RETRYABLE_STATUSES:
+            return backoff
+        if status not in (403, 429):
+            return None
+
+        retry_after = headers.get("retry-after")
+        if retry_after:
+            try:
+                delay = float(retry_after)
+            except ValueError:
+                delay = backoff
+            return delay if delay <= self.max_wait else None
+        if headers.get("x-ratelimit-remaining") == "0":
+            try:
+                delay = int(headers.get("x-ratelimit-reset", "0")) - time.time() + 1
+            except ValueError:
+                return None
+            return max(0.0, delay) if delay <= self.max_wait else None
+        if b"secondary rate limit" in body.lower():
+            # GitHub asks clients to back off for at least a minute on secondary limits.
+            return min(self.max_wait, max(60.0, backoff))
+        return None
+
+    def record_retry(self, delay: float) -> None:
+        with self._lock:
+            self.retries += 1
+            self.waited += delay
+
+    def reset_counters(self) -> None:
+        # Remaining and reset stay: they describe GitHub's live budget, not this run.
+        with self._lock:
+            self.retries = 0
+            self.waited = 0.0
+            for budget in self._budgets.values():
+                budget["consumed"] = 0
+                budget["lowest"] = budget["remaining"]
+
+    def report(self) -> dict[str, dict[str, int]]:
+        with self._lock:
+            return {
+                resource: {
+                    "consumed": budget["consumed"],
+                    "remaining": budget["remaining"],
+                    "limit": budget["limit"],
+                    "reset": budget["reset"],
+                }
+                for resource, budget in sorted(self._budgets.items())
+            }
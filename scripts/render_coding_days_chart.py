@@ -1,15 +1,25 @@
 import csv
+import io
 import json
+import os
 import sys
-from datetime import datetime
+from datetime import date, datetime
 from pathlib import Path
+from typing import TextIO
 from xml.sax.saxutils import escape
 from zoneinfo import ZoneInfo
 
+from activity_stats import compute_activity_stats, intensity_level
+from contribution_store import ContributionStore
+
 
 SCRIPT_DIR = Path(__file__).resolve().parent
 REPO_ROOT = SCRIPT_DIR.parent
 SGT = ZoneInfo("Asia/Singapore")
+FONT_FAMILY = "Segoe UI, Helvetica, Arial, sans-serif"
+SVG_COMPACT = os.environ.get("SVG_COMPACT", "1") != "0"
+# Heatmap shades for intensity levels 1-4; level 0 uses the empty-cell colour.
+INTENSITY_COLORS = ["#0E4429", "#006D32", "#26A641", "#39D353"]
 
 
 def read_daily_counts(path: Path) -> list[tuple[str, int]]:
@@ -31,6 +41,13 @@ def read_daily_counts(path: Path) -> list[tuple[str, int]]:
     return rows
 
 
+def read_store_window(path: Path, days: int) -> list[tuple[str, int]]:
+    store = ContributionStore.open(path)
+    if store is None or not len(store):
+        return []
+    return store.window(days, store.last_day)
+
+
 def read_metadata(path: Path) -> dict:
     if not path.exists():
         return {}
@@ -40,11 +57,46 @@ def read_metadata(path: Path) -> dict:
         return {}
 
 
-def build_svg(owner: str, rows: list[tuple[str, int]], metadata: dict) -> str:
+def merge_cell_runs(buckets: list[str], columns: int) -> dict[str, list[tuple[int, int, int, int]]]:
+    # Collapse the grid into (col, row, width, height) blocks per bucket: horizontal runs first,
+    # then identical runs on consecutive rows are stacked into one taller block.
+    blocks: dict[str, list[tuple[int, int, int, int]]] = {}
+    open_blocks: dict[tuple[int, int, str], int] = {}
+    for row_start in range(0, len(buckets), columns):
+        row = row_start // columns
+        row_buckets = buckets[row_start : row_start + columns]
+        still_open: dict[tuple[int, int, str], int] = {}
+        col = 0
+        while col < len(row_buckets):
+            run_end = col
+            while run_end + 1 < len(row_buckets) and row_buckets[run_end + 1] == row_buckets[col]:
+                run_end += 1
+            key = (col, run_end - col + 1, row_buckets[col])
+            if key in open_blocks:
+                index = open_blocks[key]
+                c, r, w, h = blocks[key[2]][index]
+                blocks[key[2]][index] = (c, r, w, h + 1)
+            else:
+                blocks.setdefault(key[2], []).append((col, row, key[1], 1))
+                index = len(blocks[key[2]]) - 1
+            still_open[key] = index
+            col = run_end + 1
+        open_blocks = still_open
+    return blocks
+
+
+def write_svg(out: TextIO, owner: str, rows: list[tuple[str, int]], metadata: dict, compact: bool = SVG_COMPACT) -> None:
     total_days = int(metadata.get("window_days", len(rows) or 90))
     coded_days = int(metadata.get("coded_days", sum(1 for _, c in rows if c > 0)))
     percent = float(metadata.get("coded_days_percent", round((coded_days / total_days) * 100, 1) if total_days else 0))
     total_contributions = int(metadata.get("total_contributions", metadata.get("total_commits", sum(c for _, c in rows))))
+    thresholds = metadata.get("intensity_thresholds")
+    streak_label = ""
+    if "current_streak" in metadata:
+        streak_label = (
+            f" · Current streak: {int(metadata['current_streak'])} days"
+            f" · Longest streak: {int(metadata.get('longest_streak', 0))} days"
+        )
     generated_at = metadata.get("generated_at_sgt") or datetime.now(SGT).isoformat()
     try:
         generated_dt = datetime.fromisoformat(str(generated_at).replace("Z", "+00:00")).astimezone(SGT)
@@ -73,32 +125,75 @@ def build_svg(owner: str, rows: list[tuple[str, int]], metadata: dict) -> str:
     grid_height = grid_rows * square_size + (grid_rows - 1) * square_gap
     footer_y = squares_y + grid_height + 24
     height = footer_y + 16
-
-    lines = [
-        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" role="img" aria-label="Coding consistency last 90 days">',
-        f'<text x="0" y="46" fill="{fg}" font-family="Segoe UI, Helvetica, Arial, sans-serif" font-size="30" font-weight="700">Coding Consistency (Last {total_days} Days)</text>',
-        f'<text x="0" y="76" fill="{muted}" font-family="Segoe UI, Helvetica, Arial, sans-serif" font-size="16">{escape(owner)} coded on {coded_days}/{total_days} days ({percent:.1f}%)</text>',
-        f'<text x="0" y="102" fill="{muted}" font-family="Segoe UI, Helvetica, Arial, sans-serif" font-size="14">Total contributions in window: {total_contributions}</text>',
-        f'<rect x="{progress_x}" y="{progress_y}" width="{progress_w}" height="{progress_h}" rx="10" fill="{bar_bg}" />',
-        f'<rect x="{progress_x}" y="{progress_y}" width="{fill_w}" height="{progress_h}" rx="10" fill="{accent}" />',
-        f'<text x="{progress_x + progress_w + 12}" y="{progress_y + 15}" fill="{fg}" font-family="Segoe UI, Helvetica, Arial, sans-serif" font-size="14">{percent:.1f}%</text>',
-    ]
-
-    # 90-day presence grid: green means at least one commit on that day.
-    for i in range(min(len(rows), total_days)):
-        _, count = rows[i]
-        col = i % columns
-        row = i // columns
-        x = squares_x + col * (square_size + square_gap)
-        y = squares_y + row * (square_size + square_gap)
-        color = accent if count > 0 else bar_bg
-        lines.append(f'<rect x="{x}" y="{y}" width="{square_size}" height="{square_size}" rx="2" fill="{color}" />')
-
-    lines.append(
-        f'<text x="0" y="{footer_y}" fill="{muted}" font-family="Segoe UI, Helvetica, Arial, sans-serif" font-size="12">Updated: {escape(generated_label)}</text>'
+    pitch = square_size + square_gap
+
+    if compact:
+        font = 'class="f"'
+        out.write(
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" role="img" aria-label="Coding consistency last {total_days} days">\n'
+            f"<style>.f{{font-family:{FONT_FAMILY}}}</style>\n"
+        )
+    else:
+        font = f'font-family="{FONT_FAMILY}"'
+        out.write(
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" role="img" aria-label="Coding consistency last 90 days">\n'
+        )
+
+    out.write(
+        f'<text x="0" y="46" fill="{fg}" {font} font-size="30" font-weight="700">Coding Consistency (Last {total_days} Days)</text>\n'
+        f'<text x="0" y="76" fill="{muted}" {font} font-size="16">{escape(owner)} coded on {coded_days}/{total_days} days ({percent:.1f}%)</text>\n'
+        f'<text x="0" y="102" fill="{muted}" {font} font-size="14">Total contributions in window: {total_contributions}{streak_label}</text>\n'
+        f'<rect x="{progress_x}" y="{progress_y}" width="{progress_w}" height="{progress_h}" rx="10" fill="{bar_bg}" />\n'
+        f'<rect x="{progress_x}" y="{progress_y}" width="{fill_w}" height="{progress_h}" rx="10" fill="{accent}" />\n'
+        f'<text x="{progress_x + progress_w + 12}" y="{progress_y + 15}" fill="{fg}" {font} font-size="14">{percent:.1f}%</text>\n'
     )
-    lines.append("</svg>")
-    return "\n".join(lines)
+
+    window_rows = rows[: min(len(rows), total_days)]
+    if thresholds is not None:
+        # Heatmap: shade each day by its percentile bucket among the window's active days.
+        shades = [bar_bg, *INTENSITY_COLORS]
+        cells = [shades[intensity_level(count, thresholds)] for _, count in window_rows]
+    else:
+        # Presence grid: green means at least one contribution on that day.
+        cells = [accent if count > 0 else bar_bg for _, count in window_rows]
+    if compact:
+        # One tiled pattern per colour plus one path of merged blocks per colour, instead of a <rect> per day.
+        out.write("<defs>")
+        for index, color in enumerate(dict.fromkeys(cells)):
+            out.write(
+                f'<pattern id="c{index}" x="{squares_x}" y="{squares_y}" width="{pitch}" height="{pitch}" patternUnits="userSpaceOnUse">'
+                f'<rect width="{square_size}" height="{square_size}" rx="2" fill="{color}" /></pattern>'
+            )
+        out.write("</defs>\n")
+        for index, (color, blocks) in enumerate(merge_cell_runs(cells, columns).items()):
+            out.write(f'<path fill="url(#c{index})" d="')
+            for col, row, run_w, run_h in blocks:
+                x = squares_x + col * pitch
+                y = squares_y + row * pitch
+                out.write(f"M{x} {y}h{run_w * pitch - square_gap}v{run_h * pitch - square_gap}h-{run_w * pitch - square_gap}z")
+            out.write('" />\n')
+    else:
+        for i, color in enumerate(cells):
+            x = squares_x + (i % columns) * pitch
+            y = squares_y + (i // columns) * pitch
+            out.write(f'<rect x="{x}" y="{y}" width="{square_size}" height="{square_size}" rx="2" fill="{color}" />\n')
+
+    out.write(f'<text x="0" y="{footer_y}" fill="{muted}" {font} font-size="12">Updated: {escape(generated_label)}</text>\n')
+    out.write("</svg>")
+
+
+def build_svg(owner: str, rows: list[tuple[str, int]], metadata: dict, compact: bool = SVG_COMPACT) -> str:
+    out = io.StringIO()
+    write_svg(out, owner, rows, metadata, compact)
+    return out.getvalue()
+
+
+def render(rows: list[tuple[str, int]], metadata: dict, output_svg: Path) -> None:
+    owner = metadata.get("owner", "Zerius7733")
+    output_svg.parent.mkdir(parents=True, exist_ok=True)
+    with output_svg.open("w", encoding="utf-8") as out:
+        write_svg(out, owner, rows, metadata)
+    print(f"Saved {output_svg}")
 
 
 def main() -> None:
@@ -109,18 +204,18 @@ def main() -> None:
         except ValueError:
             raise SystemExit("Usage: python render_coding_days_chart.py [90|180|365]")
 
+    input_store = REPO_ROOT / "img" / "coding-days.bin"
     input_csv = REPO_ROOT / "img" / f"coding-days-{days}d.csv"
     meta_json = REPO_ROOT / "img" / f"coding-days-{days}d.json"
     output_svg = REPO_ROOT / "img" / f"coding-days-{days}d.svg"
 
-    rows = read_daily_counts(input_csv)
+    # The day-indexed store holds the full series once; the per-window CSVs are only exports.
+    rows = read_store_window(input_store, days) or read_daily_counts(input_csv)
     metadata = read_metadata(meta_json)
-    owner = metadata.get("owner", "Zerius7733")
-
-    output_svg.parent.mkdir(parents=True, exist_ok=True)
-    svg = build_svg(owner, rows, metadata)
-    output_svg.write_text(svg, encoding="utf-8")
-    print(f"Saved {output_svg}")
+    if rows and "intensity_thresholds" not in metadata:
+        end_day = date.fromisoformat(rows[-1][0])
+        metadata = {**compute_activity_stats([count for _, count in rows], end_day, (days,))[days], **metadata}
+    render(rows, metadata, output_svg)
 
 
 if __name__ == "__main__":
@@ -1,7 +1,10 @@
 import csv
+import io
 import json
+import os
 from datetime import datetime
 from pathlib import Path
+from typing import TextIO
 from xml.sax.saxutils import escape
 from zoneinfo import ZoneInfo
 
@@ -11,7 +14,11 @@ REPO_ROOT = SCRIPT_DIR.parent
 INPUT_CSV = REPO_ROOT / "img" / "language-project-counts.csv"
 META_JSON = REPO_ROOT / "img" / "language-project-counts.json"
 OUTPUT_SVG = REPO_ROOT / "img" / "language-project-chart.svg"
+ACTIVITY_CSV = REPO_ROOT / "img" / "language-activity-counts.csv"
+ACTIVITY_JSON = REPO_ROOT / "img" / "language-activity-counts.json"
 SGT = ZoneInfo("Asia/Singapore")
+FONT_FAMILY = "Segoe UI, Helvetica, Arial, sans-serif"
+SVG_COMPACT = os.environ.get("SVG_COMPACT", "1") != "0"
 
 
 def read_counts(path: Path) -> list[tuple[str, int]]:
@@ -33,6 +40,24 @@ def read_counts(path: Path) -> list[tuple[str, int]]:
     return rows
 
 
+def read_activity_counts(path: Path) -> dict[int, list[tuple[str, int]]]:
+    if not path.exists():
+        return {}
+    windows: dict[int, list[tuple[str, int]]] = {}
+    with path.open("r", encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            language = (row.get("language") or "").strip()
+            if not language:
+                continue
+            try:
+                days = int((row.get("window_days") or "").strip())
+                count = int((row.get("count") or "").strip())
+            except ValueError:
+                continue
+            windows.setdefault(days, []).append((language, count))
+    return windows
+
+
 def read_metadata(path: Path) -> dict:
     if not path.exists():
         return {}
@@ -42,9 +67,29 @@ def read_metadata(path: Path) -> dict:
         return {}
 
 
-def build_svg(owner: str, counts: list[tuple[str, int]], generated_at: str) -> str:
+COUNTING_MODE_SUBTITLES = {
+    "repo_presence": "Each detected repo language counts once",
+    "bytes": "Bytes of code per language",
+    "primary": "Each repo counts once under its primary language",
+    "commit_activity": "Commits per language, split by each repo's language bytes",
+}
+DEFAULT_TITLE = "Projects by Detected Languages"
+DEFAULT_NOTE = "Contributing repositories for both public and private included"
+
+
+def write_svg(
+    out: TextIO,
+    owner: str,
+    counts: list[tuple[str, int]],
+    generated_at: str,
+    compact: bool = SVG_COMPACT,
+    counting_mode: str = "repo_presence",
+    title: str = DEFAULT_TITLE,
+    note: str = DEFAULT_NOTE,
+) -> None:
     rows = sorted(counts, key=lambda item: (-item[1], item[0].lower()))
     max_count = max((count for _, count in rows), default=1)
+    subtitle = COUNTING_MODE_SUBTITLES.get(counting_mode, COUNTING_MODE_SUBTITLES["repo_presence"])
 
     width = 1200
     chart_x = 150
@@ -59,48 +104,114 @@ def build_svg(owner: str, counts: list[tuple[str, int]], generated_at: str) -> s
     bar = "#58A6FF"
     bar_bg = "#30363D"
 
-    lines = [
-        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" role="img" aria-label="Projects by detected languages chart">',
-        f'<text x="0" y="54" fill="{fg}" font-family="Segoe UI, Helvetica, Arial, sans-serif" font-size="28" font-weight="700">Projects by Detected Languages</text>',
-        f'<text x="0" y="79" fill="{muted}" font-family="Segoe UI, Helvetica, Arial, sans-serif" font-size="14">Each detected repo language counts once - {escape(owner)}</text>',
-        f'<text x="0" y="98" fill="{muted}" font-family="Segoe UI, Helvetica, Arial, sans-serif" font-size="14">Contributing repositories for both public and private included</text>',
-    ]
+    out.write(
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" role="img" aria-label="{escape(title)} chart">\n'
+    )
+    if compact:
+        # Shared classes replace the per-element font and colour attributes.
+        out.write(
+            f"<style>.f{{font-family:{FONT_FAMILY}}}.l{{fill:{fg};font-size:16px}}"
+            f".n{{fill:{fg};font-size:14px}}.b{{fill:{bar}}}</style>\n"
+        )
+        font = 'class="f"'
+    else:
+        font = f'font-family="{FONT_FAMILY}"'
+    out.write(
+        f'<text x="0" y="54" fill="{fg}" {font} font-size="28" font-weight="700">{escape(title)}</text>\n'
+        f'<text x="0" y="79" fill="{muted}" {font} font-size="14">{subtitle} - {escape(owner)}</text>\n'
+        f'<text x="0" y="98" fill="{muted}" {font} font-size="14">{escape(note)}</text>\n'
+    )
 
     if not rows:
-        lines.append(
-            f'<text x="0" y="{top_padding + 18}" fill="{muted}" font-family="Segoe UI, Helvetica, Arial, sans-serif" font-size="16">No language data found. Run fetch_language_counts.py first.</text>'
+        out.write(
+            f'<text x="0" y="{top_padding + 18}" fill="{muted}" {font} font-size="16">No language data found. Run fetch_language_counts.py first.</text>\n'
+        )
+    elif compact:
+        # Every track is identical, so draw them all as one rect tiled with a single-row pattern.
+        out.write(
+            f'<defs><pattern id="track" x="{chart_x}" y="{top_padding}" width="{chart_w}" height="{row_h}" patternUnits="userSpaceOnUse">'
+            f'<rect y="8" width="{chart_w}" height="18" rx="9" fill="{bar_bg}" /></pattern></defs>\n'
+            f'<rect x="{chart_x}" y="{top_padding}" width="{chart_w}" height="{row_h * len(rows)}" fill="url(#track)" />\n'
         )
+        for idx, (language, count) in enumerate(rows):
+            y = top_padding + idx * row_h
+            bar_width = int((count / max_count) * chart_w)
+            out.write(
+                f'<text x="0" y="{y + 24}" class="f l">{escape(language)}</text>'
+                f'<rect x="{chart_x}" y="{y + 8}" width="{bar_width}" height="18" rx="9" class="b" />'
+                f'<text x="{chart_x + chart_w + 12}" y="{y + 23}" class="f n">{count}</text>\n'
+            )
     else:
         for idx, (language, count) in enumerate(rows):
             y = top_padding + idx * row_h
             bar_width = int((count / max_count) * chart_w)
-            lines.extend(
-                [
-                    f'<text x="0" y="{y + 24}" fill="{fg}" font-family="Segoe UI, Helvetica, Arial, sans-serif" font-size="16">{escape(language)}</text>',
-                    f'<rect x="{chart_x}" y="{y + 8}" width="{chart_w}" height="18" rx="9" fill="{bar_bg}" />',
-                    f'<rect x="{chart_x}" y="{y + 8}" width="{bar_width}" height="18" rx="9" fill="{bar}" />',
-                    f'<text x="{chart_x + chart_w + 12}" y="{y + 23}" fill="{fg}" font-family="Segoe UI, Helvetica, Arial, sans-serif" font-size="14">{count}</text>',
-                ]
+            out.write(
+                f'<text x="0" y="{y + 24}" fill="{fg}" {font} font-size="16">{escape(language)}</text>\n'
+                f'<rect x="{chart_x}" y="{y + 8}" width="{chart_w}" height="18" rx="9" fill="{bar_bg}" />\n'
+                f'<rect x="{chart_x}" y="{y + 8}" width="{bar_width}" height="18" rx="9" fill="{bar}" />\n'
+                f'<text x="{chart_x + chart_w + 12}" y="{y + 23}" fill="{fg}" {font} font-size="14">{count}</text>\n'
             )
 
-    lines.append(
-        f'<text x="0" y="{height - 22}" fill="{muted}" font-family="Segoe UI, Helvetica, Arial, sans-serif" font-size="12">Updated: {escape(generated_at)}</text>'
-    )
-    lines.append("</svg>")
-    return "\n".join(lines)
+    out.write(f'<text x="0" y="{height - 22}" fill="{muted}" {font} font-size="12">Updated: {escape(generated_at)}</text>\n')
+    out.write("</svg>")
 
 
-def main() -> None:
-    counts = read_counts(INPUT_CSV)
-    metadata = read_metadata(META_JSON)
-    owner = metadata.get("owner", "Zerius7733")
+def build_svg(
+    owner: str,
+    counts: list[tuple[str, int]],
+    generated_at: str,
+    compact: bool = SVG_COMPACT,
+    counting_mode: str = "repo_presence",
+    title: str = DEFAULT_TITLE,
+    note: str = DEFAULT_NOTE,
+) -> str:
+    out = io.StringIO()
+    write_svg(out, owner, counts, generated_at, compact, counting_mode, title, note)
+    return out.getvalue()
+
+
+def _generated_label(metadata: dict) -> str:
     generated_at = metadata.get("generated_at_sgt") or datetime.now(SGT).strftime("%Y-%m-%d %H:%M:%S+08:00")
-    generated_label = generated_at.replace("T", " ").replace("+08:00", " SGT")
+    return generated_at.replace("T", " ").replace("+08:00", " SGT")
+
+
+def render(counts: list[tuple[str, int]], metadata: dict, output_svg: Path = OUTPUT_SVG) -> None:
+    owner = metadata.get("owner", "Zerius7733")
+    generated_label = _generated_label(metadata)
+
+    output_svg.parent.mkdir(parents=True, exist_ok=True)
+    with output_svg.open("w", encoding="utf-8") as out:
+        write_svg(out, owner, counts, generated_label, counting_mode=metadata.get("counting_mode", "repo_presence"))
+    print(f"Saved {output_svg}")
+
 
-    OUTPUT_SVG.parent.mkdir(parents=True, exist_ok=True)
-    svg = build_svg(owner, counts, generated_label)
-    OUTPUT_SVG.write_text(svg, encoding="utf-8")
-    print(f"Saved {OUTPUT_SVG}")
+def render_activity(counts: list[tuple[str, int]], metadata: dict, output_svg: Path) -> None:
+    owner = metadata.get("owner", "Zerius7733")
+    days = metadata.get("window_days")
+    output_svg.parent.mkdir(parents=True, exist_ok=True)
+    with output_svg.open("w", encoding="utf-8") as out:
+        write_svg(
+            out,
+            owner,
+            counts,
+            _generated_label(metadata),
+            counting_mode="commit_activity",
+            title=f"Languages by Activity - Last {days} Days",
+            note=f"{metadata.get('total_contributions', 0)} commits across {metadata.get('repositories', 0)} repositories",
+        )
+    print(f"Saved {output_svg}")
+
+
+def main() -> None:
+    render(read_counts(INPUT_CSV), read_metadata(META_JSON))
+    activity_metadata = read_metadata(ACTIVITY_JSON)
+    for days, counts in sorted(read_activity_counts(ACTIVITY_CSV).items()):
+        window = (activity_metadata.get("windows") or {}).get(str(days), {})
+        render_activity(
+            counts,
+            {**activity_metadata, **window, "window_days": days},
+            ACTIVITY_CSV.parent / f"language-activity-{days}d.svg",
+        )
 
 
 if __name__ == "__main__":
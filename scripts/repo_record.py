@@ -0,0 +1,75 @@
+import sys
+
+
+class RepoRecord:
+    # Only what the scan reads. A REST repo object carries ~100 fields; a page of records stays a few KB.
+    __slots__ = ("full_name", "fork", "language", "owner_login", "pushed_at", "languages", "parent")
+
+    def __init__(
+        self,
+        full_name: str,
+        fork: bool = False,
+        language: str | None = None,
+        owner_login: str = "",
+        pushed_at: str | None = None,
+        languages: dict[str, int] | None = None,
+        parent: str | None = None,
+    ) -> None:
+        self.full_name = full_name
+        self.fork = fork
+        # Language names and owner logins repeat across thousands of repos; share one string object each.
+        self.language = sys.intern(language) if language else None
+        self.owner_login = sys.intern(owner_login)
+        self.pushed_at = pushed_at
+        self.languages = {sys.intern(name): size for name, size in languages.items()} if languages is not None else None
+        self.parent = parent
+
+    def __repr__(self) -> str:
+        return f"RepoRecord({self.full_name!r}, fork={self.fork}, language={self.language!r})"
+
+    @classmethod
+    def from_rest(cls, payload: dict) -> "RepoRecord | None":
+        full_name = payload.get("full_name")
+        if not isinstance(full_name, str):
+            return None
+        language = payload.get("language")
+        pushed_at = payload.get("pushed_at")
+        return cls(
+            full_name,
+            fork=bool(payload.get("fork")),
+            language=language if isinstance(language, str) else None,
+            owner_login=str((payload.get("owner") or {}).get("login") or ""),
+            pushed_at=pushed_at if isinstance(pushed_at, str) else None,
+            parent=(payload.get("parent") or {}).get("full_name"),
+        )
+
+    @classmethod
+    def from_graphql(cls, node: dict) -> "RepoRecord | None":
+        full_name = node.get("nameWithOwner")
+        if not isinstance(full_name, str):
+            return None
+        record = cls(
+            full_name,
+            fork=bool(node.get("isFork")),
+            language=(node.get("primaryLanguage") or {}).get("name"),
+            owner_login=str((node.get("owner") or {}).get("login") or ""),
+            pushed_at=node.get("pushedAt"),
+            parent=(node.get("parent") or {}).get("nameWithOwner"),
+        )
+        languages = node.get("languages") or {}
+        edges = languages.get("edges")
+        # Repos with more languages than fit in one edge page keep using the REST fallback.
+        if isinstance(edges, list) and int(languages.get("totalCount") or 0) <= len(edges):
+            record.languages = {}
+            for edge in edges:
+                name = ((edge or {}).get("node") or {}).get("name")
+                if isinstance(name, str):
+                    record.languages[sys.intern(name)] = int((edge or {}).get("size") or 0)
+        return record
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RepoRecord":
+        return cls(**{name: data[name] for name in cls.__slots__ if name in data})
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
@@ -0,0 +1,116 @@
+import json
+import os
+import threading
+from collections import Counter
+from pathlib import Path
+
+
+COUNTING_MODES = ("repo_presence", "bytes", "primary")
+
+
+class RepoSnapshotStore:
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._repos: dict[str, dict] = {}
+        self._owners: dict[str, list[str]] = {}
+        if path.exists():
+            try:
+                loaded = json.loads(path.read_text(encoding="utf-8"))
+            except json.JSONDecodeError:
+                loaded = {}
+            if isinstance(loaded, dict):
+                self._repos = {key: value for key, value in (loaded.get("repos") or {}).items() if isinstance(value, dict)}
+                self._owners = {key: value for key, value in (loaded.get("owners") or {}).items() if isinstance(value, list)}
+
+    @staticmethod
+    def _key(owner: str, full_name: str) -> str:
+        # Fork inclusion depends on who is being counted, so snapshots are per (owner, repo).
+        return f"{owner.lower()}:{full_name}"
+
+    def get(self, owner: str, full_name: str, pushed_at: str | None) -> dict | None:
+        with self._lock:
+            snapshot = self._repos.get(self._key(owner, full_name))
+            # Language bytes only change on push, so a matching pushed_at means the snapshot is current.
+            if pushed_at and snapshot and snapshot.get("pushed_at") == pushed_at:
+                self.hits += 1
+                return snapshot
+            self.misses += 1
+            return None
+
+    def peek(self, owner: str, full_name: str) -> dict | None:
+        # Any stored snapshot, current or not, without touching the hit/miss counters.
+        with self._lock:
+            return self._repos.get(self._key(owner, full_name))
+
+    def put(self, owner: str, full_name: str, snapshot: dict) -> None:
+        with self._lock:
+            self._repos[self._key(owner, full_name)] = snapshot
+            self._dirty = True
+
+    def record_scan(self, owner: str, full_names: list[str]) -> None:
+        with self._lock:
+            if self._owners.get(owner.lower()) != full_names:
+                self._owners[owner.lower()] = full_names
+                self._dirty = True
+            # A complete listing is authoritative: forget this owner's repos that no longer exist.
+            prefix = f"{owner.lower()}:"
+            listed = {self._key(owner, full_name) for full_name in full_names}
+            for key in [key for key in self._repos if key.startswith(prefix) and key not in listed]:
+                del self._repos[key]
+                self._dirty = True
+
+    def snapshots(self, owner: str) -> list[dict] | None:
+        with self._lock:
+            full_names = self._owners.get(owner.lower())
+            if full_names is None:
+                return None
+            return [
+                self._repos[key]
+                for key in (self._key(owner, full_name) for full_name in full_names)
+                if key in self._repos
+            ]
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = json.dumps(
+                {"owners": dict(sorted(self._owners.items())), "repos": dict(sorted(self._repos.items()))},
+                separators=(",", ":"),
+            )
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+            tmp_path.write_text(payload, encoding="utf-8")
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+
+
+def snapshot_languages(snapshot: dict) -> set[str]:
+    if not snapshot.get("included"):
+        return set()
+    detected = {lang for lang, byte_count in (snapshot.get("languages") or {}).items() if byte_count}
+    if not detected:
+        primary = snapshot.get("language")
+        detected = {primary} if isinstance(primary, str) and primary else {"Other"}
+    return detected
+
+
+def tally(snapshots: list[dict], mode: str = "repo_presence") -> Counter:
+    counts: Counter = Counter()
+    for snapshot in snapshots:
+        if not snapshot.get("included"):
+            continue
+        if mode == "bytes":
+            for language, byte_count in (snapshot.get("languages") or {}).items():
+                if byte_count:
+                    counts[language] += int(byte_count)
+        elif mode == "primary":
+            counts[snapshot.get("language") or "Other"] += 1
+        else:
+            for language in snapshot_languages(snapshot):
+                counts[language] += 1
+    return counts
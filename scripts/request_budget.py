@@ -0,0 +1,271 @@
+import math
+import os
+from collections import Counter
+from datetime import datetime
+
+import fetch_language_counts as fetch
+from repo_record import RepoRecord
+from repo_snapshots import tally
+
+
+BUDGET_PLANNING = os.environ.get("BUDGET_PLANNING", "0") == "1"
+RATE_LIMIT_RESERVE = max(0, int(os.environ.get("RATE_LIMIT_RESERVE", "50")))
+LISTING_PAGE_SIZE = 100
+
+
+def graphql_points(connection_requests: int) -> int:
+    # GitHub's score: requests needed to fill every connection, divided by 100 and rounded, at least 1.
+    return max(1, round(connection_requests / 100))
+
+
+def _stage(name: str, core: int = 0, conditional: int = 0, graphql: int = 0, points: int = 0, **details: object) -> dict:
+    return {"stage": name, "core": core, "conditional": conditional, "graphql": graphql, "points": points, **details}
+
+
+def repo_cost(repo: RepoRecord, owner: str) -> tuple[int, int]:
+    snapshot = fetch.REPO_SNAPSHOTS.peek(owner, repo.full_name)
+    if snapshot is not None and repo.pushed_at and snapshot.get("pushed_at") == repo.pushed_at:
+        return 0, 0
+    if repo.fork and not fetch.TOKEN:
+        return 0, 0
+    urls: list[str] = []
+    included = True
+    if repo.fork:
+        verdict = fetch.cached_fork_verdict(repo.full_name, owner, repo.pushed_at)
+        if verdict is None:
+            urls.append(f"{fetch.API_URL}/repos/{repo.full_name}/commits?author={owner}&per_page=1")
+        # An unknown verdict is planned as a contribution, so its languages call is budgeted too.
+        included = verdict is not False
+    if included and repo.languages is None:
+        urls.append(f"{fetch.API_URL}/repos/{repo.full_name}/languages")
+    # Cached URLs go out as conditional requests, which are free when GitHub answers 304.
+    conditional = sum(1 for url in urls if fetch.HTTP_CACHE and fetch.HTTP_CACHE.lookup(url) is not None)
+    return len(urls), conditional
+
+
+def plan_owner(owner: str, dry_run: bool = False) -> dict:
+    mode = fetch.listing_mode()
+    checkpoint = fetch.SCAN_CHECKPOINTS.load(owner, mode)
+    listed_before = bool(checkpoint and checkpoint[2])
+    kind = fetch.owner_kind(owner)
+    repos = fetch.scan_repos(owner)
+    if dry_run and not listed_before:
+        # A dry run must not leave a fresh-looking listing behind for the next real run to trust.
+        fetch.SCAN_CHECKPOINTS.clear(owner, mode)
+    if listed_before:
+        pages = 0
+    elif mode == "rest":
+        # REST paging stops at the first empty page, which can sit right after a full one.
+        pages = math.ceil(len(repos) / LISTING_PAGE_SIZE) + 1
+    else:
+        pages = max(1, math.ceil(len(repos) / LISTING_PAGE_SIZE))
+
+    costs = {repo.full_name: repo_cost(repo, owner) for repo in repos}
+    owner_requests = int(bool(fetch.TOKEN)) + int(kind != "viewer")
+    # A real run reuses this process's listing and owner kind; after a dry run the run pays for both again.
+    spent = not dry_run
+    stages = [
+        _stage(
+            "listing",
+            core=pages if mode == "rest" else 0,
+            graphql=pages if mode == "graphql" else 0,
+            points=pages * graphql_points(1 + LISTING_PAGE_SIZE) if mode == "graphql" else 0,
+            mode=mode,
+            repos=len(repos),
+            spent_while_planning=spent,
+        ),
+        _stage("owner_kind", core=owner_requests, spent_while_planning=spent),
+        _stage(
+            "languages",
+            core=sum(requests for requests, _ in costs.values()),
+            conditional=sum(conditional for _, conditional in costs.values()),
+            repos=len(repos),
+            repos_to_fetch=sum(1 for requests, _ in costs.values() if requests),
+        ),
+    ]
+    if kind != "org":
+        spans = sum(math.ceil(days / fetch.MAX_COLLECTION_SPAN_DAYS) for days in fetch.CODING_WINDOWS)
+        stages.append(_stage("contributions", graphql=1, points=1))
+        stages.append(
+            _stage(
+                "language_activity",
+                graphql=1,
+                points=graphql_points(spans * (1 + fetch.MAX_CONTRIBUTION_REPOSITORIES)),
+            )
+        )
+    return {"kind": kind, "stages": stages, "repos": repos, "costs": costs, "fetch_limit": len(repos)}
+
+
+def _run_totals(owner_plans: dict[str, dict]) -> dict[str, int]:
+    totals = Counter()
+    for owner_plan in owner_plans.values():
+        for stage in owner_plan["stages"]:
+            if stage.get("spent_while_planning"):
+                continue
+            totals.update({key: stage[key] for key in ("core", "conditional", "graphql", "points")})
+    return dict(totals)
+
+
+def prioritise(owner_plans: dict[str, dict], available: int) -> str | None:
+    # Repos served from snapshots cost nothing and always stay. The rest are fetched newest push first
+    # until the budget runs out; older ones are counted from what is already known until a later run.
+    candidates = sorted(
+        (
+            (repo.pushed_at or "", owner, repo)
+            for owner, owner_plan in owner_plans.items()
+            for repo in owner_plan["repos"]
+            if owner_plan["costs"][repo.full_name][0]
+        ),
+        key=lambda item: item[0],
+        reverse=True,
+    )
+    selected: dict[str, set[str]] = {owner: set() for owner in owner_plans}
+    cutoff = None
+    for pushed_at, owner, repo in candidates:
+        requests = owner_plans[owner]["costs"][repo.full_name][0]
+        if requests > available:
+            cutoff = pushed_at
+            break
+        available -= requests
+        selected[owner].add(repo.full_name)
+
+    for owner, owner_plan in owner_plans.items():
+        costs = owner_plan["costs"]
+        free = [repo for repo in owner_plan["repos"] if not costs[repo.full_name][0]]
+        chosen = [repo for repo in owner_plan["repos"] if repo.full_name in selected[owner]]
+        chosen.sort(key=lambda repo: repo.pushed_at or "", reverse=True)
+        deferred = [repo for repo in owner_plan["repos"] if costs[repo.full_name][0] and repo.full_name not in selected[owner]]
+        owner_plan["repos"] = free + chosen + deferred
+        owner_plan["fetch_limit"] = len(free) + len(chosen)
+        owner_plan["deferred"] = len(deferred)
+    return cutoff
+
+
+def plan_run(owners: list[str], dry_run: bool = False) -> dict:
+    # Read before anything is spent: planning itself lists repos, and an exhausted budget must be
+    # reported rather than waited on.
+    budget = fetch.rate_limit_status()
+    core = budget.get("core", {})
+    graphql = budget.get("graphql", {})
+    needed = ["core"] + (["graphql"] if fetch.listing_mode() == "graphql" else [])
+    exhausted = [resource for resource in needed if budget.get(resource, {}).get("remaining", 0) <= 0]
+    plan = {
+        "owners": {},
+        "totals": {},
+        "budget": budget,
+        "reserve": RATE_LIMIT_RESERVE,
+        "exhausted": exhausted,
+        "core_short": bool(exhausted),
+        "graphql_short": graphql.get("remaining", 0) <= 0,
+        "deferred_before": None,
+        "planning_requests": {},
+    }
+    if exhausted:
+        return plan
+
+    before = fetch.SCHEDULER.report()
+    owner_plans = {owner: plan_owner(owner, dry_run) for owner in owners}
+    after = fetch.SCHEDULER.report()
+    planning_requests = {
+        resource: stats["consumed"] - before.get(resource, {}).get("consumed", 0) for resource, stats in after.items()
+    }
+    totals = _run_totals(owner_plans)
+    available = core.get("remaining", 0) - planning_requests.get("core", 0) - RATE_LIMIT_RESERVE
+    # Everything but the per-repo language fetches is paid up front; the repos share what is left.
+    fixed_core = sum(
+        stage["core"]
+        for owner_plan in owner_plans.values()
+        for stage in owner_plan["stages"]
+        if stage["stage"] != "languages" and not stage.get("spent_while_planning")
+    )
+    core_short = totals.get("core", 0) > available
+    return {
+        **plan,
+        "owners": owner_plans,
+        "totals": totals,
+        "core_short": core_short,
+        "graphql_short": totals.get("points", 0) > graphql.get("remaining", 0) - planning_requests.get("graphql", 0),
+        "deferred_before": prioritise(owner_plans, available - fixed_core) if core_short else None,
+        "planning_requests": planning_requests,
+    }
+
+
+def summary(plan: dict) -> dict:
+    return {
+        **{key: value for key, value in plan.items() if key != "owners"},
+        "owners": {
+            owner: {
+                "kind": owner_plan["kind"],
+                "stages": owner_plan["stages"],
+                "fetch_limit": owner_plan["fetch_limit"],
+                "deferred": owner_plan.get("deferred", 0),
+            }
+            for owner, owner_plan in plan["owners"].items()
+        },
+    }
+
+
+def print_plan(plan: dict) -> None:
+    for resource in plan["exhausted"]:
+        budget = plan["budget"].get(resource, {})
+        reset = datetime.fromtimestamp(budget.get("reset", 0), fetch.SGT).strftime("%H:%M SGT")
+        print(f"Budget [{resource}]: exhausted until {reset}; nothing was listed or planned")
+    if plan["exhausted"]:
+        return
+    rows = [(owner, stage) for owner, owner_plan in plan["owners"].items() for stage in owner_plan["stages"]]
+    width = max((len(owner) for owner, _ in rows), default=5)
+    print(f"{'owner':<{width}}  {'stage':<17}  {'core':>6}  {'cond.':>6}  {'graphql':>7}  {'points':>6}")
+    for owner, stage in rows:
+        note = "  (spent while planning)" if stage.get("spent_while_planning") else ""
+        print(
+            f"{owner:<{width}}  {stage['stage']:<17}  {stage['core']:>6}  {stage['conditional']:>6}"
+            f"  {stage['graphql']:>7}  {stage['points']:>6}{note}"
+        )
+    totals = plan["totals"]
+    for resource, needed in (("core", totals.get("core", 0)), ("graphql", totals.get("points", 0))):
+        budget = plan["budget"].get(resource, {})
+        reset = datetime.fromtimestamp(budget.get("reset", 0), fetch.SGT).strftime("%H:%M SGT")
+        print(f"Budget [{resource}]: run needs ~{needed} of {budget.get('remaining', 0)}/{budget.get('limit', 0)} remaining (resets {reset})")
+    if totals.get("conditional"):
+        print(f"{totals['conditional']} core request(s) revalidate cached responses and are free if unchanged")
+    if plan["core_short"]:
+        deferred = sum(owner_plan.get("deferred", 0) for owner_plan in plan["owners"].values())
+        print(
+            f"Core budget is short (reserve {plan['reserve']}): the most recently pushed repos are fetched first; "
+            f"{deferred} repo(s) pushed at or before {plan['deferred_before']} are counted from their previous snapshot "
+            "or listed language until a later run fetches them; unchecked forks are left out"
+        )
+    if plan["graphql_short"]:
+        print("GraphQL budget is short: contribution and language activity queries may be rate limited")
+    spent = ", ".join(f"{count} {resource}" for resource, count in plan["planning_requests"].items() if count)
+    print(f"Planning used {spent or 'no'} request(s)")
+
+
+def count_languages_within_budget(owner: str, plan: dict) -> Counter:
+    owner_plan = plan["owners"][owner]
+    repos = owner_plan["repos"]
+    limit = owner_plan["fetch_limit"]
+    if limit >= len(repos):
+        return fetch.count_languages(repos, owner)
+    # A limited scan keeps the listing checkpoint, so the next run fetches just the deferred repos.
+    counts = fetch.count_languages(repos, owner, limit=limit)
+    stale: list[dict] = []
+    listed = 0
+    unchecked_forks = 0
+    for repo in repos[limit:]:
+        snapshot = fetch.REPO_SNAPSHOTS.peek(owner, repo.full_name)
+        if snapshot is not None:
+            stale.append(snapshot)
+            continue
+        # Never fetched: fall back to the listing's primary language rather than dropping the repo.
+        included = not repo.fork or fetch.cached_fork_verdict(repo.full_name, owner, repo.pushed_at) is True
+        if not included:
+            unchecked_forks += repo.fork
+            continue
+        listed += 1
+        stale.append({"pushed_at": repo.pushed_at, "language": repo.language, "languages": dict(repo.languages or {}), "included": True})
+    print(
+        f"Deferred {len(repos) - limit} repo(s) for {owner}: {len(stale) - listed} counted from their previous snapshot, "
+        f"{listed} from their listed language, {unchecked_forks} unchecked fork(s) left out"
+    )
+    return counts + tally(stale, fetch.COUNTING_MODE)
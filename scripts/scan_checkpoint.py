@@ -0,0 +1,52 @@
+import json
+import os
+import time
+from collections.abc import Iterable
+from pathlib import Path
+
+
+LISTING_MODES = ("rest", "graphql")
+
+
+class ScanCheckpoint:
+    def __init__(self, directory: Path, max_age_seconds: float) -> None:
+        self.directory = directory
+        self.max_age_seconds = max_age_seconds
+
+    def _path(self, owner: str, mode: str) -> Path:
+        return self.directory / f"{owner.lower()}-{mode}.json"
+
+    def load(self, owner: str, mode: str) -> tuple[object, list[dict], bool] | None:
+        path = self._path(owner, mode)
+        if not path.exists():
+            return None
+        try:
+            loaded = json.loads(path.read_text(encoding="utf-8"))
+        except json.JSONDecodeError:
+            return None
+        if not isinstance(loaded, dict) or not isinstance(loaded.get("repos"), list):
+            return None
+        # An old listing may have shifted under us (repos created, deleted or re-sorted); start over.
+        if time.time() - float(loaded.get("saved_at") or 0) > self.max_age_seconds:
+            self.clear(owner, mode)
+            return None
+        return loaded.get("position"), loaded["repos"], bool(loaded.get("complete"))
+
+    def save(self, owner: str, mode: str, position: object, repos: Iterable[dict], complete: bool = False) -> None:
+        path = self._path(owner, mode)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        header = json.dumps({"saved_at": time.time(), "position": position, "complete": complete}, separators=(",", ":"))
+        # Written one repo at a time so a large listing is never encoded into a single string.
+        with tmp_path.open("w", encoding="utf-8") as f:
+            f.write(header[:-1] + ',"repos":[')
+            for index, repo in enumerate(repos):
+                if index:
+                    f.write(",")
+                f.write(json.dumps(repo, separators=(",", ":")))
+            f.write("]}")
+        os.replace(tmp_path, path)
+
+    def clear(self, owner: str, mode: str | None = None) -> None:
+        for listing_mode in (mode,) if mode else LISTING_MODES:
+            self._path(owner, listing_mode).unlink(missing_ok=True)
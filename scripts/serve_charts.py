@@ -0,0 +1,172 @@
+import gzip
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import fetch_language_counts as fetch
+import generate_language_project_chart as generate
+
+
+SERVE_HOST = os.environ.get("SERVE_HOST", "127.0.0.1")
+SERVE_PORT = int(os.environ.get("SERVE_PORT", "8787"))
+REFRESH_INTERVAL_SECONDS = max(60.0, float(os.environ.get("REFRESH_INTERVAL_SECONDS", "3600")))
+SERVE_MAX_AGE = max(0, int(os.environ.get("SERVE_MAX_AGE", "300")))
+CONTENT_TYPES = {
+    ".svg": "image/svg+xml",
+    ".csv": "text/csv; charset=utf-8",
+    ".json": "application/json",
+}
+
+
+class Asset:
+    __slots__ = ("body", "gzipped", "etag", "content_type")
+
+    def __init__(self, body: bytes, content_type: str) -> None:
+        self.body = body
+        self.content_type = content_type
+        self.etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        # Compress once at load time; only keep it when it actually saves bytes.
+        compressed = gzip.compress(body, compresslevel=9, mtime=0)
+        self.gzipped = compressed if len(compressed) < len(body) else None
+
+
+def load_assets(output_root: Path) -> dict[str, Asset]:
+    assets: dict[str, Asset] = {}
+    if not output_root.exists():
+        return assets
+    for path in sorted(output_root.rglob("*")):
+        content_type = CONTENT_TYPES.get(path.suffix)
+        if content_type is None or not path.is_file() or path.name == fetch.BUILD_MANIFEST_NAME:
+            continue
+        assets["/" + path.relative_to(output_root).as_posix()] = Asset(path.read_bytes(), content_type)
+    return assets
+
+
+class ChartService:
+    def __init__(self, owners: list[str], output_root: Path = fetch.OUTPUT_DIR) -> None:
+        self.owners = owners
+        self.output_root = output_root
+        # Requests read this reference without locking; refreshes swap in a whole new dict.
+        self.assets = load_assets(output_root)
+        self.status: dict = {"refreshes": 0, "last_started": None, "last_finished": None, "last_error": None}
+        self._wake = threading.Event()
+        self._refresh_lock = threading.Lock()
+
+    def refresh(self) -> None:
+        with self._refresh_lock:
+            started = time.perf_counter()
+            self.status["last_started"] = datetime.now(fetch.SGT).isoformat()
+            try:
+                generate.generate(self.owners, self.output_root)
+                self.status["last_error"] = None
+            except Exception as error:
+                # Keep serving the previous outputs; the next scheduled or requested refresh retries.
+                print(f"Warning: refresh failed: {error}")
+                self.status["last_error"] = str(error)
+            self.assets = load_assets(self.output_root)
+            self.status["refreshes"] += 1
+            self.status["last_finished"] = datetime.now(fetch.SGT).isoformat()
+            self.status["last_duration_s"] = round(time.perf_counter() - started, 3)
+            print(f"Refreshed {len(self.assets)} assets in {self.status['last_duration_s']:.2f}s")
+
+    def request_refresh(self) -> None:
+        self._wake.set()
+
+    def run_scheduler(self) -> None:
+        while True:
+            self.refresh()
+            self._wake.wait(REFRESH_INTERVAL_SECONDS)
+            self._wake.clear()
+
+
+def etag_matches(header: str | None, etag: str) -> bool:
+    if not header:
+        return False
+    candidates = {value.strip().removeprefix("W/") for value in header.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def make_handler(service: ChartService) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def log_message(self, format: str, *args: object) -> None:
+            return
+
+        def send_body(self, status: int, body: bytes, content_type: str, headers: dict[str, str] | None = None) -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if self.command != "HEAD":
+                self.wfile.write(body)
+
+        def send_json(self, status: int, payload: object) -> None:
+            body = json.dumps(payload).encode("utf-8")
+            self.send_body(status, body, "application/json", {"Cache-Control": "no-store"})
+
+        def do_GET(self) -> None:
+            path = self.path.split("?", 1)[0]
+            if path == "/status":
+                return self.send_json(200, {**service.status, "assets": sorted(service.assets)})
+            asset = service.assets.get(path)
+            if asset is None:
+                return self.send_json(404, {"message": "Not Found"})
+
+            headers = {
+                "ETag": asset.etag,
+                "Cache-Control": f"public, max-age={SERVE_MAX_AGE}",
+                "Vary": "Accept-Encoding",
+            }
+            if etag_matches(self.headers.get("If-None-Match"), asset.etag):
+                self.send_response(304)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            body = asset.body
+            if asset.gzipped is not None and "gzip" in (self.headers.get("Accept-Encoding") or ""):
+                body = asset.gzipped
+                headers["Content-Encoding"] = "gzip"
+            self.send_body(200, body, asset.content_type, headers)
+
+        do_HEAD = do_GET
+
+        def do_POST(self) -> None:
+            # Drain any request body so the keep-alive connection stays usable.
+            self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            if self.path.split("?", 1)[0] != "/refresh":
+                return self.send_json(404, {"message": "Not Found"})
+            service.request_refresh()
+            self.send_json(202, {"message": "Refresh scheduled"})
+
+    return Handler
+
+
+def main() -> None:
+    service = ChartService(generate.parse_owners(sys.argv[1:]))
+    server = ThreadingHTTPServer((SERVE_HOST, SERVE_PORT), make_handler(service))
+    server.daemon_threads = True
+    threading.Thread(target=service.run_scheduler, daemon=True).start()
+    print(f"Serving charts on http://{SERVE_HOST}:{server.server_port} (refresh every {REFRESH_INTERVAL_SECONDS:.0f}s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        fetch.CLIENT.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import json
+import re
+import threading
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import urlsplit
+
+
+# Collapse concrete owners/repos out of the path so requests aggregate per endpoint class.
+ENDPOINT_PATTERNS = [
+    (re.compile(r"^/repos/[^/]+/[^/]+/(.+)$"), r"repos/:repo/\1"),
+    (re.compile(r"^/repos/[^/]+/[^/]+$"), "repos/:repo"),
+    (re.compile(r"^/users/[^/]+/(.+)$"), r"users/:owner/\1"),
+    (re.compile(r"^/users/[^/]+$"), "users/:owner"),
+    (re.compile(r"^/orgs/[^/]+/(.+)$"), r"orgs/:org/\1"),
+]
+
+
+def endpoint_class(url: str) -> str:
+    path = urlsplit(url).path
+    for pattern, replacement in ENDPOINT_PATTERNS:
+        if pattern.match(path):
+            return pattern.sub(replacement, path)
+    return path.strip("/") or "/"
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+class RequestTelemetry:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._endpoints: dict[str, dict] = {}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._endpoints = {}
+
+    def record(
+        self,
+        url: str,
+        status: int,
+        latency: float,
+        wire_bytes: int,
+        cache_hit: bool,
+        rate_remaining: str | None,
+        retry: bool = False,
+    ) -> None:
+        with self._lock:
+            stats = self._endpoints.setdefault(
+                endpoint_class(url),
+                {
+                    "requests": 0,
+                    "latencies": [],
+                    "bytes": 0,
+                    "statuses": Counter(),
+                    "cache_hits": 0,
+                    "retries": 0,
+                    "rate_limit_remaining": None,
+                },
+            )
+            stats["requests"] += 1
+            stats["latencies"].append(latency)
+            stats["bytes"] += wire_bytes
+            stats["statuses"][str(status)] += 1
+            stats["cache_hits"] += int(cache_hit)
+            stats["retries"] += int(retry)
+            if rate_remaining is not None and rate_remaining.isdigit():
+                previous = stats["rate_limit_remaining"]
+                remaining = int(rate_remaining)
+                stats["rate_limit_remaining"] = remaining if previous is None else min(previous, remaining)
+
+    def summary(self) -> dict[str, dict]:
+        with self._lock:
+            report: dict[str, dict] = {}
+            for name, stats in sorted(self._endpoints.items()):
+                latencies = stats["latencies"]
+                report[name] = {
+                    "requests": stats["requests"],
+                    "total_latency_s": round(sum(latencies), 4),
+                    "p50_latency_ms": round(percentile(latencies, 0.5) * 1000, 1),
+                    "p95_latency_ms": round(percentile(latencies, 0.95) * 1000, 1),
+                    "max_latency_ms": round(max(latencies, default=0.0) * 1000, 1),
+                    "bytes": stats["bytes"],
+                    "statuses": dict(sorted(stats["statuses"].items())),
+                    "cache_hits": stats["cache_hits"],
+                    "retries": stats["retries"],
+                    "rate_limit_remaining": stats["rate_limit_remaining"],
+                }
+            return report
+
+    def write_report(self, path: Path, generated_at: datetime, extra: dict | None = None) -> None:
+        endpoints = self.summary()
+        report = {
+            "generated_at": generated_at.isoformat(),
+            "totals": {
+                "requests": sum(stats["requests"] for stats in endpoints.values()),
+                "total_latency_s": round(sum(stats["total_latency_s"] for stats in endpoints.values()), 4),
+                "bytes": sum(stats["bytes"] for stats in endpoints.values()),
+                "cache_hits": sum(stats["cache_hits"] for stats in endpoints.values()),
+                "retries": sum(stats["retries"] for stats in endpoints.values()),
+            },
+            "endpoints": endpoints,
+            **(extra or {}),
+        }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")